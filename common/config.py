@@ -14,6 +14,7 @@
 
 import json
 import os
+from functools import lru_cache
 
 from fastapi.security import HTTPBasic
 from pyTigerGraph import TigerGraphConnection
@@ -102,6 +103,7 @@ doc_process_switch = graphrag_config.get("doc_process_switch", True)
 entity_extraction_switch = graphrag_config.get("entity_extraction_switch", doc_process_switch)
 entity_resolution_switch = graphrag_config.get("entity_resolution_switch", entity_extraction_switch)
 community_detection_switch = graphrag_config.get("community_detection_switch", entity_resolution_switch)
+route_batch_size_limit = graphrag_config.get("route_batch_size_limit", 32)
 
 if "model_name" not in llm_config or "model_name" not in llm_config["embedding_service"]:
     if "model_name" not in llm_config:
@@ -146,6 +148,13 @@ def get_llm_service(llm_config) -> LLM_Model:
     else:
         raise Exception("LLM Completion Service Not Supported")
 
+
+@lru_cache(maxsize=1)
+def get_shared_llm_service() -> LLM_Model:
+    """Return the LLM service of llm_config, built once and shared across requests."""
+    return get_llm_service(llm_config)
+
+
 if os.getenv("INIT_EMBED_STORE", "true") == "true":
     conn = TigerGraphConnection(
         host=db_config.get("hostname", "http://tigergraph"),
@@ -0,0 +1,54 @@
+# Copyright (c) 2025 TigerGraph, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+_VERSION_RE = re.compile(r"(\d+)\.(\d+)(?:\.(\d+))?")
+
+
+def parse_tg_version(ver: str) -> tuple[int, int, int]:
+    """Return a TigerGraph version such as "4.2.0" or "4.2.0-rc1" as (4, 2, 0).
+
+    Suffixes after the numeric parts are ignored.
+    """
+    m = _VERSION_RE.match(ver.strip())
+    if m is None:
+        raise ValueError(f"Unrecognized TigerGraph version: {ver}")
+    return tuple(int(x or 0) for x in m.groups())
+
+
+# hosts the global GDS library was installed on by this process
+_gds_installed_hosts = set()
+_gds_lock = threading.Lock()
+
+
+def install_gds(conn):
+    """Install the GDS library on the connection's TigerGraph host, once per host.
+
+    GDS is global to the TigerGraph instance rather than to a graph.
+    """
+    with _gds_lock:
+        if conn.host in _gds_installed_hosts:
+            logger.info(f"GDS library already installed on {conn.host}, skipped")
+            return
+        logger.info(f"Installing GDS library")
+        q_res = conn.gsql(
+            """USE GLOBAL\nimport package gds\ninstall function gds.**"""
+        )
+        logger.info(f"Done installing GDS library with status {q_res}")
+        _gds_installed_hosts.add(conn.host)
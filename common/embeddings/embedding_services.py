@@ -19,6 +19,10 @@ class EmbeddingModel(Embeddings):
     Implements connections to the desired embedding API.
     """
 
+    # whether queries and documents are embedded the same way, so that a batch
+    # of queries can go through embed_documents
+    symmetric_embeddings = False
+
     def __init__(self, config: dict, model_name: str):
         """Initialize an EmbeddingModel
         Read JSON config file and export the details as environment variables.
@@ -100,6 +104,23 @@ class EmbeddingModel(Embeddings):
                 duration
             )
 
+    def embed_queries(self, questions: List[str]) -> List[List[float]]:
+        """Embed Queries.
+        Embed several strings as queries.
+
+        Models whose query and document embeddings are the same are called once
+        for the whole batch, others embed each question on its own.
+
+        Args:
+            questions (List[str]):
+                The strings to embed.
+        Returns:
+            Nested lists of floats that contain embeddings, in order.
+        """
+        if self.symmetric_embeddings and len(questions) > 1:
+            return self.embed_documents(questions)
+        return [self.embed_query(question) for question in questions]
+
     async def aembed_query(self, question: str) -> List[float]:
         """Embed Query Async.
         Embed a string.
@@ -136,6 +157,8 @@ class EmbeddingModel(Embeddings):
 class AzureOpenAI_Ada002(EmbeddingModel):
     """Azure OpenAI Ada-002 Embedding Model"""
 
+    symmetric_embeddings = True
+
     def __init__(self, config):
         super().__init__(config, model_name=config.get("model_name", "OpenAI ada-002"))
         from langchain.embeddings import AzureOpenAIEmbeddings
@@ -146,6 +169,8 @@ class AzureOpenAI_Ada002(EmbeddingModel):
 class OpenAI_Embedding(EmbeddingModel):
     """OpenAI Embedding Model"""
 
+    symmetric_embeddings = True
+
     def __init__(self, config):
         super().__init__(
             config, model_name=config.get("model_name", "text-embedding-3-small")
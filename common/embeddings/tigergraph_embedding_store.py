@@ -23,6 +23,7 @@ import Levenshtein as lev
 from asyncer import asyncify
 from langchain_core.documents.base import Document
 
+from common.db.tg_utils import install_gds, parse_tg_version
 from common.embeddings.base_embedding_store import EmbeddingStore
 from common.embeddings.embedding_services import EmbeddingModel
 from common.logs.log import req_id_cv
@@ -63,14 +64,9 @@ class TigerGraphEmbeddingStore(EmbeddingStore):
                 apiToken = token,
              )
 
-        tg_version = self.conn.getVer()
-        ver = tg_version.split(".")
-        if int(ver[0]) >= 4 and int(ver[1]) >= 2:
-            logger.info(f"Installing GDS library")
-            q_res = self.conn.gsql(
-                """USE GLOBAL\nimport package gds\ninstall function gds.**"""
-            )
-            logger.info(f"Done installing GDS library with status {q_res}")
+        ver = self.conn.getVer()
+        if parse_tg_version(ver) >= (4, 2):
+            install_gds(self.conn)
             if self.conn.graphname and not self.conn.graphname == "MyGraph":
                 current_schema = self.conn.gsql(f"USE GRAPH {self.conn.graphname}\n ls")
                 if "- embedding(Dimension=" in current_schema:
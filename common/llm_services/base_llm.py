@@ -20,6 +20,8 @@ class LLM_Model:
 
     def __init__(self, config):
         self.llm = None
+        # SageMaker endpoints are configured by endpoint rather than by model
+        self.model_name = config.get("llm_model", config.get("endpoint_name"))
 
     def _read_prompt_file(self, path):
         with open(path) as f:
@@ -106,16 +108,22 @@ class LLM_Model:
     @property
     def route_response_prompt(self):
         """Property to get the prompt for the RouteResponse tool."""
+        # keep everything that varies per call at the end, so providers can
+        # cache the static prefix
         prompt = """\
 You are an expert at routing a user question to a vectorstore or function calls.
 Use the vectorstore for questions on that would be best suited by text documents.
 Use the function calls for questions that ask about structured data, or operations on structured data.
 Keep in mind that some questions about documents such as "how many documents are there?" can be answered by function calls.
-The function calls can be used to answer questions about these entities: {v_types} and relationships: {e_types}.
+The function calls can be used to answer questions about the entities and relationships listed in the context below.
 Otherwise, use vectorstore. Give a binary choice 'functions' or 'vectorstore' based on the question.
 Return the a JSON with a single key 'datasource' and no premable or explaination.
-Question to route: {question}
-Format: {format_instructions}\
+Format: {format_instructions}
+
+### Context
+Entities: {v_types}
+Relationships: {e_types}
+Question to route: {question}\
 """
         return prompt
 
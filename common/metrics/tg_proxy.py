@@ -1,6 +1,12 @@
 import time
 import re
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+import pyTigerGraph.pyTigerGraphBase as tg_base
 from pyTigerGraph import TigerGraphConnection
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from common.metrics.prometheus_metrics import metrics
 from common.logs.logwriter import LogWriter
 import logging
@@ -10,6 +16,39 @@ from common.logs.log import req_id_cv
 logger = logging.getLogger(__name__)
 
 
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    # the session is shared by every user's connection, so never keep cookies
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    # only retry failed connects, the request never reached TigerGraph then
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=128,
+        max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.1),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class _PooledRequests:
+    """Stands in for the `requests` module inside pyTigerGraph so its
+    per-call `requests.request` reuses keep-alive connections."""
+
+    def __init__(self):
+        self.session = _make_session()
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+pooled_requests = _PooledRequests()
+tg_base.requests = pooled_requests
+
+
 class TigerGraphConnectionProxy:
     def __init__(self, tg_connection: TigerGraphConnection, auth_mode: str = "pwd"):
         self.original_req = tg_connection._req
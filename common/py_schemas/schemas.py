@@ -23,12 +23,56 @@ class NaturalLanguageQuery(BaseModel):
     rag_method: Optional[str] = None
 
 
+class RouteQuestionsRequest(BaseModel):
+    questions: List[str]
+
+
 class SupportAIQuestion(BaseModel):
     question: str
     method: str = "hybrid"
     method_params: dict = {}
 
 
+class SupportAIMethodParams(BaseModel):
+    top_k: int
+    expand: bool = False
+    verbose: bool = False
+    combine: bool = False
+
+
+class HybridParams(SupportAIMethodParams):
+    indices: List[str]
+    num_hops: int
+    num_seen_min: int
+    similarity_threshold: float = 0.90
+    method: str = "similarity"
+    chunk_only: bool = False
+    doc_only: bool = False
+
+
+class SimilarityParams(SupportAIMethodParams):
+    index: str
+    withHyDE: bool = False
+
+
+class ContextualParams(SupportAIMethodParams):
+    index: str
+    lookback: int = 3
+    lookahead: int = 3
+    withHyDE: bool = False
+
+
+class EntityRelationshipParams(SupportAIMethodParams):
+    pass
+
+
+class CommunityParams(SupportAIMethodParams):
+    community_level: int
+    similarity_threshold: float = 0.90
+    with_chunk: bool = True
+    with_doc: bool = False
+
+
 class SupportAIMethod(enum.StrEnum):
     SUPPORTAI = enum.auto()
     GRAPHRAG = enum.auto()
@@ -27,7 +27,7 @@ class MapQuestionToSchemaResponse(BaseModel):
         description="The list of vertices mentioned in the question. If there are no vertices mentioned, then use an empty list."
     )
     target_vertex_attributes: Optional[Dict[str, List[str]]] = Field(
-        description="The dictionary of vertex attributes mentioned in the question, formated in {'vertex_type_1': ['vertex_attribute_1', 'vertex_attribute_2'], 'vertex_type_2': ['vertex_attribute_1', 'vertex_attribute_2']}"
+        description="The dictionary of vertex attributes mentioned in the question, using the attribute names exactly as listed for each vertex type in the schema, formated in {'vertex_type_1': ['vertex_attribute_1', 'vertex_attribute_2'], 'vertex_type_2': ['vertex_attribute_1', 'vertex_attribute_2']}"
     )
     target_vertex_ids: Optional[Dict[str, List[str]]] = Field(
         description="The dictionary of vertex ids mentioned in the question. If there are no vertex ids mentioned, then use an empty dict. formated in {'vertex_type_1': ['vertex_id_1', 'vertex_id_2'], 'vertex_type_2': ['vertex_id_1', 'vertex_id_2']}"
@@ -36,7 +36,7 @@ class MapQuestionToSchemaResponse(BaseModel):
         description="The list of edges mentioned in the question"
     )
     target_edge_attributes: Optional[Dict[str, List[str]]] = Field(
-        description="The dictionary of edge attributes mentioned in the question, formated in {'edge_type': ['edge_attribute_1', 'edge_attribute_2']}"
+        description="The dictionary of edge attributes mentioned in the question, using the attribute names exactly as listed for each edge type in the schema, formated in {'edge_type': ['edge_attribute_1', 'edge_attribute_2']}"
     )
 
 
@@ -1,25 +1,38 @@
+import time
+from collections import deque
 from threading import Lock
 
 
 DONE = "DONE"
 
+# seconds within which a repeated progress message is merged into the unread one
+MERGE_WINDOW = 0.05
+
 
 class Q:
     def __init__(self):
-        self.q = []
+        self.q = deque()
         self.l = Lock()
 
     def put(self, item):
+        now = time.monotonic()
         with self.l:
-            self.q.append(item)
+            # merge a progress message repeated before the consumer read the first one
+            if (
+                item != DONE
+                and len(self.q) > 0
+                and self.q[-1][0] == item
+                and now - self.q[-1][1] < MERGE_WINDOW
+            ):
+                return
+            self.q.append((item, now))
 
     def pop(self):
-        if len(self.q) > 0:
-            with self.l:
-                item = self.q[0]
-                self.q = self.q[1:]
-                return item
+        with self.l:
+            if len(self.q) > 0:
+                return self.q.popleft()[0]
 
 
     def clear(self):
-        self.q.clear()
+        with self.l:
+            self.q.clear()
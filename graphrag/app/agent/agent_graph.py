@@ -14,6 +14,7 @@
 
 import json
 import logging
+import re
 from typing import Dict, List, Optional
 
 from agent.agent_generation import TigerGraphAgentGenerator
@@ -35,6 +36,10 @@ from common.py_schemas import GraphRAGResponse, MapQuestionToSchemaResponse
 logger = logging.getLogger(__name__)
 
 
+def _normalize_question(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
 class GraphState(TypedDict):
     """
     Represents the state of the agent graph.
@@ -42,6 +47,7 @@ class GraphState(TypedDict):
     """
 
     question: str
+    question_embedding: Optional[List[float]]
     conversation: Optional[List[Dict[str, str]]]
     generation: str
     context: str
@@ -50,6 +56,7 @@ class GraphState(TypedDict):
     schema_mapping: Optional[MapQuestionToSchemaResponse]
     error_history: list[dict] = []
     question_retry_count: int = 0
+    rewrite_history: Optional[List[str]]
 
 
 class TigerGraphAgentGraph:
@@ -65,6 +72,7 @@ class TigerGraphAgentGraph:
         enable_human_in_loop=False,
         q: Q = None,
         supportai_retriever="hybridsearch",
+        enable_checks=False,
     ):
         self.workflow = StateGraph(GraphState)
         self.llm_provider = llm_provider
@@ -76,6 +84,16 @@ class TigerGraphAgentGraph:
         self.cypher_gen = cypher_gen_tool
         self.enable_human_in_loop = enable_human_in_loop
         self.q = q
+        self.router = TigerGraphAgentRouter(self.llm_provider, self.db_connection)
+        # hallucination and usefulness checks are currently no-ops, so by
+        # default generate_answer goes straight to END
+        self.enable_checks = enable_checks
+
+        self._answer_handlers = {
+            "supportai": self._answer_from_result,
+            "inquiryai": self._answer_from_json,
+            "cypher": self._answer_from_cypher,
+        }
 
         self.supportai_enabled = True
         self.supportai_retriever = supportai_retriever.lower().replace(" ", "")
@@ -103,7 +121,7 @@ class TigerGraphAgentGraph:
         if state["question_retry_count"] > 2:
             return "apologize"
         self.emit_progress("Thinking")
-        step = TigerGraphAgentRouter(self.llm_provider, self.db_connection)
+        step = self.router
         logger.debug_pii(
             f"request_id={req_id_cv.get()} Routing question: {state['question']}"
         )
@@ -124,7 +142,7 @@ class TigerGraphAgentGraph:
         Apologize for not being able to answer the question.
         """
         self.emit_progress(DONE)
-        state["answer"] = GraphRAGResponse(
+        state["answer"] = GraphRAGResponse.model_construct(
             natural_language_response="I'm sorry, I don't know the answer to that question. Please try rephrasing your question.",
             answered_question=False,
             response_type="error",
@@ -231,6 +249,7 @@ class TigerGraphAgentGraph:
             top_k=5,
             num_seen_min=2,
             num_hops=3,
+            query_embedding=state["question_embedding"],
         )
 
         query_name = "GraphRAG_Hybrid_Search"
@@ -259,7 +278,8 @@ class TigerGraphAgentGraph:
         step = retriever.search(
             state["question"],
             index="DocumentChunk",
-            top_k=5
+            top_k=5,
+            query_embedding=state["question_embedding"],
         )
 
         query_name = "Content_Similarity_Search"
@@ -287,7 +307,8 @@ class TigerGraphAgentGraph:
         step = retriever.search(
             state["question"],
             index="DocumentChunk",
-            top_k=3
+            top_k=3,
+            query_embedding=state["question_embedding"],
         )
 
         query_name = "Chunk_Sibling_Search"
@@ -317,6 +338,7 @@ class TigerGraphAgentGraph:
             community_level=2,
             top_k=5,
             with_chunk=True,
+            query_embedding=state["question_embedding"],
         )
 
         query_name = "GraphRAG_Community_Search"
@@ -334,6 +356,11 @@ class TigerGraphAgentGraph:
         """
         Run the agent supportai search.
         """
+        # embed the question once and share it with whichever retriever runs
+        if state.get("question_embedding") is None:
+            state["question_embedding"] = self.embedding_model.embed_query(
+                state["question"]
+            )
         if self.supportai_retriever == "hybridsearch":
             return self.hybrid_search(state)
         elif self.supportai_retriever == "similaritysearch":
@@ -345,66 +372,77 @@ class TigerGraphAgentGraph:
         else:
             raise ValueError(f"Invalid supportai retriever: {self.supportai_retriever}")
     
+    def _answer_from_result(self, step, question, ctx, log_pii):
+        if log_pii:
+            logger.debug_pii(
+                f"request_id={req_id_cv.get()} Got result: {ctx['result']}"
+            )
+        return step.generate_answer(question, ctx["result"])
+
+    def _answer_from_json(self, step, question, ctx, log_pii):
+        if log_pii:
+            logger.debug_pii(
+                f"request_id={req_id_cv.get()} Got result: {ctx['result']}"
+            )
+        try:
+            context_data_str = json.dumps(ctx["result"])
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to serialize context to JSON: {e}")
+            raise ValueError("Invalid context data format. Unable to convert to JSON.")
+
+        return step.generate_answer(question, context_data_str)
+
+    def _answer_from_cypher(self, step, question, ctx, log_pii):
+        if log_pii:
+            logger.debug_pii(
+                f"request_id={req_id_cv.get()} Got result: {ctx['answer']}"
+            )
+        return step.generate_answer(question, ctx["answer"], ctx["cypher"])
+
     def generate_answer(self, state):
         """
         Run the agent generator.
         """
         self.emit_progress("Connecting the pieces")
         step = TigerGraphAgentGenerator(self.llm_provider)
+        ctx = state["context"]
+        src = state["lookup_source"]
+        question = state["question"]
+        # retrieval results can be large, only format them when they will be logged
+        log_pii = logger.isEnabledFor(logging.DEBUG_PII)
         logger.debug_pii(
-            f"request_id={req_id_cv.get()} Generating answer for question: {state['question']}"
+            f"request_id={req_id_cv.get()} Generating answer for question: {question}"
         )
 
-        if state["lookup_source"] == "supportai":
-            logger.debug_pii(
-                f"""request_id={req_id_cv.get()} Got result: {state["context"]["result"]}"""
-            )
-            answer = step.generate_answer(
-                state["question"], state["context"]["result"]
-            )
-        elif state["lookup_source"] == "inquiryai":
-            logger.debug_pii(
-                f"""request_id={req_id_cv.get()} Got result: {state["context"]["result"]}"""
-            )
-            try:
-                context_data_str = json.dumps(state["context"]["result"])
-            except (TypeError, ValueError) as e:
-                logger.error(f"Failed to serialize context to JSON: {e}")
-                raise ValueError("Invalid context data format. Unable to convert to JSON.")
-
-            answer = step.generate_answer(state["question"], context_data_str)
-
-        elif state["lookup_source"] == "cypher":
-            logger.debug_pii(
-                f"""request_id={req_id_cv.get()} Got result: {state["context"]["answer"]}"""
-            )
-            answer = step.generate_answer(state["question"], state["context"]["answer"], state["context"]["cypher"])
+        answer = self._answer_handlers[src](step, question, ctx, log_pii)
         logger.debug_pii(
             f"request_id={req_id_cv.get()} Generated answer: {answer.generated_answer}"
         )
 
-        if state["lookup_source"] == "supportai":
-            import re
-
+        if src == "supportai":
             citations = [re.sub(r"_chunk_\d+", "", x) for x in answer.citation]
-            state["context"]["reasoning"] = list(set(citations))
+            ctx["reasoning"] = list(set(citations))
 
+        # validated here: the websocket path hands this object to the client as is
         try:
             resp = GraphRAGResponse(
                 natural_language_response=answer.generated_answer,
                 answered_question=True,
-                response_type=state["lookup_source"],
-                query_sources=state["context"],
+                response_type=src,
+                query_sources=ctx,
             )
         except Exception as e:
             resp = GraphRAGResponse(
                 natural_language_response="I'm sorry, I don't know the answer to that question.",
                 answered_question=False,
-                response_type=state["lookup_source"],
+                response_type=src,
                 query_sources={"error": True, "error_history": state["error_history"]},
             )
         state["answer"] = resp
 
+        if not self.enable_checks:
+            self.emit_progress(DONE)
+
         return state
 
     def rewrite_question(self, state):
@@ -414,7 +452,22 @@ class TigerGraphAgentGraph:
         self.emit_progress("Rephrasing the question")
         step = TigerGraphAgentRewriter(self.llm_provider)
         question_str = state["question"]
-        state["question"] = step.rewrite_question(question_str)
+        new_q = step.rewrite_question(question_str)
+
+        history = state.get("rewrite_history") or []
+        history.append(_normalize_question(question_str))
+        state["rewrite_history"] = history
+        if _normalize_question(new_q) in history:
+            # the rewrite is a no-op, so another pass would only repeat the
+            # same routing, retrieval and generation; give up instead
+            logger.info(
+                f"request_id={req_id_cv.get()} rewritten question matches a previous question, apologizing"
+            )
+            state["question_retry_count"] = 3
+            return state
+
+        state["question"] = new_q
+        state["question_embedding"] = None
         return state
 
     # remove halucinaton check, always return grounded
@@ -527,7 +580,9 @@ class TigerGraphAgentGraph:
                 {"error": "apologize", "success": "generate_answer"},
             )
             # remove hallucination and usefulness check
-            if self.supportai_enabled:
+            if not self.enable_checks:
+                self.workflow.add_edge("generate_answer", END)
+            elif self.supportai_enabled:
                 self.workflow.add_conditional_edges(
                     "generate_answer",
                     self.check_answer_for_usefulness_and_hallucinations,
@@ -557,7 +612,9 @@ class TigerGraphAgentGraph:
                 {"error": "rewrite_question", "success": "generate_answer"},
             )
 
-            if self.supportai_enabled:
+            if not self.enable_checks:
+                self.workflow.add_edge("generate_answer", END)
+            elif self.supportai_enabled:
                 self.workflow.add_conditional_edges(
                     "generate_answer", 
                     # alwasy return grounded
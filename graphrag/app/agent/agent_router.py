@@ -12,6 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import re
+from threading import Lock
+
+from cachetools import TTLCache
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_community.callbacks.manager import get_openai_callback
@@ -24,14 +29,127 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# vertex/edge type names per (host, graph), refreshed every minute
+_schema_types_cache = TTLCache(maxsize=128, ttl=60)
+_schema_types_lock = Lock()
+
+
+def get_schema_types(db_conn) -> tuple:
+    """Return the (vertex types, edge types) of the connection's graph, cached with a TTL."""
+    key = (db_conn.host, db_conn.graphname)
+    with _schema_types_lock:
+        types = _schema_types_cache.get(key)
+    if types is None:
+        types = (db_conn.getVertexTypes(), db_conn.getEdgeTypes())
+        with _schema_types_lock:
+            _schema_types_cache[key] = types
+    return types
+
+
+def invalidate_schema_types(db_conn=None):
+    """Drop the cached schema types for a connection's graph, or for all graphs."""
+    with _schema_types_lock:
+        if db_conn is None:
+            _schema_types_cache.clear()
+        else:
+            _schema_types_cache.pop((db_conn.host, db_conn.graphname), None)
+    router_cache.clear()
+
 class RouterResponse(BaseModel):
     datasource: str = Field(description="The datasource to use for the question")
 
+
+class RouterCache:
+    """Cache of routing decisions keyed by the structure of the question.
+
+    Questions that only differ in the entities they mention (quoted strings,
+    numbers, ids and capitalized names) share a template and therefore a
+    routing decision. Words naming a vertex or edge type, in any case and
+    singular or plural, are kept as the type name, since they are what the
+    router decides on.
+    """
+
+    # words joined by "/", "." or "-" (I/O, U.S, e-mail) are a single token
+    _token_re = re.compile(r'"[^"]*"|\w+(?:[/.\-]\w+)*|[^\w\s]')
+    placeholder = "<ENT>"
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = Lock()
+
+    @staticmethod
+    def _schema_name(tok: str, schema_names: set):
+        low = tok.lower()
+        if low in schema_names:
+            return low
+        # plurals: Documents -> document, Addresses -> address, Companies -> company
+        for suffix, singular in (("s", ""), ("es", ""), ("ies", "y")):
+            if low.endswith(suffix):
+                name = low[: -len(suffix)] + singular
+                if name in schema_names:
+                    return name
+        return None
+
+    def template(self, question: str, schema_names: set) -> str:
+        tokens = []
+        for i, tok in enumerate(self._token_re.findall(question)):
+            name = self._schema_name(tok, schema_names)
+            if name is not None:
+                tok = name
+            elif (
+                tok[0] == '"'
+                or any(c.isdigit() for c in tok)
+                or (i > 0 and tok[0].isupper())
+            ):
+                tok = self.placeholder
+            else:
+                tok = tok.lower()
+            if not (tok == self.placeholder and tokens and tokens[-1] == tok):
+                tokens.append(tok)
+        return " ".join(tokens)
+
+    def key(self, db_conn, question: str, v_types, e_types) -> tuple:
+        schema_names = {t.lower() for t in (*v_types, *e_types)}
+        return (
+            db_conn.host,
+            db_conn.graphname,
+            tuple(sorted(v_types)),
+            tuple(sorted(e_types)),
+            self.template(question, schema_names),
+        )
+
+    def get(self, key: tuple):
+        with self._lock:
+            res = self._cache.get(key)
+        return res.model_copy() if res is not None else None
+
+    def set(self, key: tuple, res: RouterResponse):
+        with self._lock:
+            self._cache[key] = res.model_copy()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+router_cache = RouterCache()
+
 class TigerGraphAgentRouter:
     def __init__(self, llm_model, db_conn: TigerGraphConnection):
         self.llm = llm_model
         self.db_conn = db_conn
 
+        # the prompt, parser and chain don't depend on the question, build them once
+        self._parser = PydanticOutputParser(pydantic_object=RouterResponse)
+        self._prompt = PromptTemplate(
+            template=self.llm.route_response_prompt,
+            input_variables=["question", "v_types", "e_types"],
+            partial_variables={
+                "format_instructions": self._parser.get_format_instructions()
+            }
+        )
+        self._chain = self._prompt | self.llm.model | self._parser
+
     def route_question(self, question: str) -> str:
         """Route a question to the appropriate datasource.
 
@@ -42,23 +160,18 @@ class TigerGraphAgentRouter:
             str: The datasource to use for the question.
         """
         LogWriter.info(f"request_id={req_id_cv.get()} ENTRY route_question with {question}")
-        v_types = self.db_conn.getVertexTypes()
-        e_types = self.db_conn.getEdgeTypes()
-
-        router_parser = PydanticOutputParser(pydantic_object=RouterResponse)
+        v_types, e_types = get_schema_types(self.db_conn)
 
-        prompt = PromptTemplate(
-            template=self.llm.route_response_prompt,
-            input_variables=["question", "v_types", "e_types"],
-            partial_variables={
-                "format_instructions": router_parser.get_format_instructions()
-            }
-        )
+        cache_key = router_cache.key(self.db_conn, question, v_types, e_types)
+        res = router_cache.get(cache_key)
+        if res is not None:
+            LogWriter.info(f"request_id={req_id_cv.get()} EXIT route_question with cached {res}")
+            return res
 
-        question_router = prompt | self.llm.model | router_parser
         usage_data = {}
         with get_openai_callback() as cb:
-            res = question_router.invoke({"question": question, "v_types": v_types, "e_types": e_types})
+            res = self._chain.invoke({"question": question, "v_types": v_types, "e_types": e_types})
+            router_cache.set(cache_key, res)
 
             usage_data["input_tokens"] = cb.prompt_tokens
             usage_data["output_tokens"] = cb.completion_tokens
@@ -67,3 +180,43 @@ class TigerGraphAgentRouter:
             logger.info(f"route_question usage: {usage_data}")
         LogWriter.info(f"request_id={req_id_cv.get()} EXIT route_question with {res}")
         return res
+
+    async def route_questions(self, questions: list[str]) -> list[RouterResponse]:
+        """Route a batch of questions to the appropriate datasources.
+
+        The schema types are fetched once and the LLM calls run concurrently.
+
+        Args:
+            questions (list[str]): The questions to route.
+
+        Returns:
+            list[RouterResponse]: The datasource to use for each question, in order.
+        """
+        LogWriter.info(f"request_id={req_id_cv.get()} ENTRY route_questions with {len(questions)} questions")
+        v_types, e_types = await asyncio.to_thread(get_schema_types, self.db_conn)
+
+        cache_keys = [
+            router_cache.key(self.db_conn, q, v_types, e_types) for q in questions
+        ]
+        res = [router_cache.get(k) for k in cache_keys]
+        misses = [i for i, r in enumerate(res) if r is None]
+
+        usage_data = {}
+        with get_openai_callback() as cb:
+            routed = await asyncio.gather(
+                *(
+                    self._chain.ainvoke({"question": questions[i], "v_types": v_types, "e_types": e_types})
+                    for i in misses
+                )
+            )
+            for i, r in zip(misses, routed):
+                router_cache.set(cache_keys[i], r)
+                res[i] = r
+
+            usage_data["input_tokens"] = cb.prompt_tokens
+            usage_data["output_tokens"] = cb.completion_tokens
+            usage_data["total_tokens"] = cb.total_tokens
+            usage_data["cost"] = cb.total_cost
+            logger.info(f"route_questions usage: {usage_data}")
+        LogWriter.info(f"request_id={req_id_cv.get()} EXIT route_questions")
+        return res
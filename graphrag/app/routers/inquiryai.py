@@ -5,18 +5,27 @@ import traceback
 from typing import Annotated, List, Union
 
 from agent.agent import make_agent
+from agent.agent_router import RouterResponse, TigerGraphAgentRouter
 from fastapi import (APIRouter, Depends, HTTPException, Request, 
                      status)
 from fastapi.security.http import HTTPBase
 from tools.validation_utils import MapQuestionToSchemaException
 
-from common.config import embedding_service, embedding_store, session_handler, service_status
+from common.config import (
+    embedding_service,
+    embedding_store,
+    get_shared_llm_service,
+    route_batch_size_limit,
+    service_status,
+    session_handler,
+)
 from common.logs.log import req_id_cv
 from common.logs.logwriter import LogWriter
 from common.metrics.prometheus_metrics import metrics as pmetrics
 from common.py_schemas.schemas import (GraphRAGResponse, GSQLQueryInfo,
                                        GSQLQueryList, NaturalLanguageQuery,
-                                       QueryDeleteRequest, QueryUpsertRequest)
+                                       QueryDeleteRequest, QueryUpsertRequest,
+                                       RouteQuestionsRequest)
 
 logger = logging.getLogger(__name__)
 
@@ -89,6 +98,23 @@ def retrieve_answer(
     return resp
 
 
+@router.post("/{graphname}/agent/route_batch")
+async def route_questions(
+    graphname,
+    query: RouteQuestionsRequest,
+    conn: Request,
+    credentials: Annotated[HTTPBase, Depends(security)],
+) -> List[RouterResponse]:
+    if len(query.questions) > route_batch_size_limit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {route_batch_size_limit} questions can be routed in one batch",
+        )
+    conn = conn.state.conn
+    router_step = TigerGraphAgentRouter(get_shared_llm_service(), conn)
+    return await router_step.route_questions(query.questions)
+
+
 conversation_history = []
 
 
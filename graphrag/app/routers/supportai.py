@@ -12,13 +12,29 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import json
 import logging
+import re
+from threading import Lock
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response, status
+from cachetools import TTLCache
+from agent.agent_router import invalidate_schema_types
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import ORJSONResponse
 from fastapi.security.http import HTTPBase
+from pydantic import ValidationError
 from supportai import supportai
+from tools.schema_rep import invalidate_schema_rep
 from supportai.concept_management.create_concepts import (
     CommunityConceptCreator,
     EntityConceptCreator,
@@ -26,37 +42,60 @@ from supportai.concept_management.create_concepts import (
     RelationshipConceptCreator,
 )
 from supportai.retrievers import (
+    BaseRetriever,
     EntityRelationshipRetriever,
     HybridRetriever,
     SimilarityRetriever,
     SiblingRetriever,
     CommunityRetriever
 )
+from supportai.retrievers.SimilarityRetriever import answer_cache
 
 from common.config import (
     db_config,
     graphrag_config,
     embedding_service,
     embedding_store,
-    get_llm_service,
+    get_shared_llm_service,
     llm_config,
     service_status,
 )
 from common.logs.logwriter import LogWriter
 from common.py_schemas.schemas import (  # SupportAIInitConfig,; SupportAIMethod,
-    GraphRAGResponse,
+    CommunityParams,
+    ContextualParams,
     CreateIngestConfig,
+    EntityRelationshipParams,
+    HybridParams,
     LoadingInfo,
+    SimilarityParams,
     SupportAIMethod,
     SupportAIQuestion,
 )
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["SupportAI"])
+router = APIRouter(tags=["SupportAI"], default_response_class=ORJSONResponse)
 
 security = HTTPBase(scheme="basic", auto_error=False)
 
 
+_retriever_classes = {
+    "hybrid": HybridRetriever,
+    "similarity": SimilarityRetriever,
+    "contextual": SiblingRetriever,
+    "entityrelationship": EntityRelationshipRetriever,
+    "community": CommunityRetriever,
+}
+
+
+def _get_retriever(method: str, conn):
+    # retrievers hold the caller's authenticated connection, so only the
+    # LLM service is shared between requests
+    return _retriever_classes[method](
+        embedding_service, embedding_store, get_shared_llm_service(), conn
+    )
+
+
 def check_embedding_store_status():
     if service_status["embedding_store"]["error"]:
         return HTTPException(
@@ -74,6 +113,10 @@ def initialize(
     conn = conn.state.conn
 
     resp = supportai.init_supportai(conn, graphname)
+    invalidate_schema_types(conn)
+    invalidate_schema_rep(conn)
+    BaseRetriever.installed_queries.clear()
+    answer_cache.invalidate(conn.host, graphname)
     schema_res, index_res, query_res = resp[0], resp[1], resp[2]
     return {
         "host_name": conn._tg_connection.host,  # include host_name for debugging from client. Their pyTG conn might not have the same host as what's configured in graphrag
@@ -96,22 +139,28 @@ def create_ingest(
     return supportai.create_ingest(graphname, cfg, conn)
 
 
-@router.post("/{graphname}/graphrag/ingest")
-@router.post("/{graphname}/supportai/ingest")
-def ingest(
-    graphname,
-    loader_info: LoadingInfo,
-    conn: Request,
-    credentials: Annotated[HTTPBase, Depends(security)],
-):
-    conn = conn.state.conn
-    if loader_info.file_path is None:
-        raise Exception("File path not provided")
-    if loader_info.load_job_id is None:
-        raise Exception("Load job id not provided")
-    if loader_info.data_source_id is None:
-        raise Exception("Data source id not provided")
+_NOPRINT_MARKER = (
+    "Running the following loading job in background with '-noprint' option:"
+)
+_INGEST_OUTPUT_RE = re.compile(r"Jobid:\s*(\S+).*?Log directory:\s*(\S+)", re.S)
 
+# status of loading jobs submitted with background=true, per (graph, load job).
+# The table lives in the memory of one worker process, so a status request only
+# finds jobs submitted to the same worker, and it is lost on restart.
+_ingest_jobs = TTLCache(maxsize=1024, ttl=3600)
+_ingest_jobs_lock = Lock()
+
+
+def _parse_loading_job_output(res: str) -> tuple[str, str]:
+    """Return the (job id, log directory) reported by a -noprint loading job."""
+    start = res.find(_NOPRINT_MARKER)
+    m = _INGEST_OUTPUT_RE.search(res, start) if start >= 0 else None
+    if m is None:
+        raise Exception(f"Could not find the loading job id in the GSQL output: {res}")
+    return m.group(1), m.group(2)
+
+
+def _run_loading_job(graphname, loader_info: LoadingInfo, conn) -> dict:
     try:
         res = conn.gsql(
             'USE GRAPH {}\nRUN LOADING JOB -noprint {} USING {}="{}"'.format(
@@ -122,28 +171,155 @@ def ingest(
             )
         )
     except Exception as e:
-        if (
-            "Running the following loading job in background with '-noprint' option:"
-            in str(e)
-        ):
+        if _NOPRINT_MARKER in str(e):
             res = str(e)
         else:
             raise e
+    job_id, log_location = _parse_loading_job_output(res)
+    # cached answers predate this load; ECC processes it later, see LLMSemanticCache
+    answer_cache.invalidate(conn.host, graphname)
     return {
         "job_name": loader_info.load_job_id,
-        "job_id": res.split(
-            "Running the following loading job in background with '-noprint' option:"
-        )[1]
-        .split("Jobid: ")[1]
-        .split("\n")[0],
-        "log_location": res.split(
-            "Running the following loading job in background with '-noprint' option:"
-        )[1]
-        .split("Log directory: ")[1]
-        .split("\n")[0],
+        "job_id": job_id,
+        "log_location": log_location,
     }
 
 
+def _run_ingest_job(graphname, loader_info: LoadingInfo, conn):
+    key = (graphname, loader_info.load_job_id)
+    try:
+        # the job runs on in TigerGraph; its progress is reported for job_id there
+        job = {**_run_loading_job(graphname, loader_info, conn), "status": "started"}
+    except Exception as e:
+        logger.error(f"Loading job {loader_info.load_job_id} failed to start: {e}")
+        job = {
+            "job_name": loader_info.load_job_id,
+            "status": "failed",
+            "error": str(e),
+        }
+    with _ingest_jobs_lock:
+        _ingest_jobs[key] = job
+
+
+@router.post("/{graphname}/graphrag/ingest")
+@router.post("/{graphname}/supportai/ingest")
+def ingest(
+    graphname,
+    loader_info: LoadingInfo,
+    conn: Request,
+    credentials: Annotated[HTTPBase, Depends(security)],
+    bg_tasks: BackgroundTasks,
+    background: bool = False,
+):
+    conn = conn.state.conn
+    if loader_info.file_path is None:
+        raise Exception("File path not provided")
+    if loader_info.load_job_id is None:
+        raise Exception("Load job id not provided")
+    if loader_info.data_source_id is None:
+        raise Exception("Data source id not provided")
+
+    if background:
+        with _ingest_jobs_lock:
+            _ingest_jobs[(graphname, loader_info.load_job_id)] = {
+                "job_name": loader_info.load_job_id,
+                "status": "submitted",
+            }
+        bg_tasks.add_task(_run_ingest_job, graphname, loader_info, conn)
+        return {"job_name": loader_info.load_job_id, "status": "submitted"}
+
+    return _run_loading_job(graphname, loader_info, conn)
+
+
+@router.get("/{graphname}/graphrag/ingest/{load_job_id}/status")
+@router.get("/{graphname}/supportai/ingest/{load_job_id}/status")
+def ingest_status(
+    graphname,
+    load_job_id: str,
+    credentials: Annotated[HTTPBase, Depends(security)],
+):
+    with _ingest_jobs_lock:
+        job = _ingest_jobs.get((graphname, load_job_id))
+    if job is None:
+        raise HTTPException(
+            status_code=404, detail=f"No background ingest found for {load_job_id}"
+        )
+    return job
+
+
+def _hybrid_search(retriever, question, p: HybridParams):
+    return retriever.search(
+        question,
+        p.indices,
+        p.top_k,
+        p.similarity_threshold,
+        p.num_hops,
+        p.num_seen_min,
+        p.expand,
+        p.method,
+        p.chunk_only,
+        p.doc_only,
+        p.verbose,
+    )
+
+
+def _similarity_search(retriever, question, p: SimilarityParams):
+    return retriever.search(
+        question, p.index, p.top_k, p.withHyDE, p.expand, p.verbose
+    )
+
+
+def _contextual_search(retriever, question, p: ContextualParams):
+    return retriever.search(
+        question,
+        p.index,
+        p.top_k,
+        lookback=p.lookback,
+        lookahead=p.lookahead,
+        expand=p.expand,
+        withHyDE=p.withHyDE,
+        verbose=p.verbose,
+    )
+
+
+def _entityrelationship_search(retriever, question, p: EntityRelationshipParams):
+    return retriever.search(question, p.top_k)
+
+
+def _community_search(retriever, question, p: CommunityParams):
+    return retriever.search(
+        question,
+        p.community_level,
+        p.top_k,
+        p.similarity_threshold,
+        p.expand,
+        p.with_chunk,
+        p.with_doc,
+        p.verbose,
+    )
+
+
+_search_handlers = {
+    "hybrid": (HybridParams, _hybrid_search),
+    "similarity": (SimilarityParams, _similarity_search),
+    "contextual": (ContextualParams, _contextual_search),
+    "entityrelationship": (EntityRelationshipParams, _entityrelationship_search),
+    "community": (CommunityParams, _community_search),
+}
+
+
+def _dispatch(handlers: dict, query: SupportAIQuestion, conn):
+    method = query.method.lower()
+    if method not in handlers:
+        raise Exception(f"Method {query.method} not implemented")
+    params_model, handler = handlers[method]
+    try:
+        params = params_model.model_validate(query.method_params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    return handler(_get_retriever(method, conn), query.question, params)
+
+
 @router.post("/{graphname}/graphrag/search")
 @router.post("/{graphname}/supportai/search")
 def search(
@@ -154,93 +330,71 @@ def search(
 ):
     check_embedding_store_status()
     conn = conn.state.conn
-    if "expand" not in query.method_params:
-        query.method_params["expand"] = False
-    if "verbose" not in query.method_params:
-        query.method_params["verbose"] = False
-    if query.method.lower() == "hybrid":
-        retriever = HybridRetriever(
-            embedding_service, embedding_store, get_llm_service(llm_config), conn
-        )
-        if "method" not in query.method_params:
-            query.method_params["method"] = "similarity"
-        if "chunk_only" not in query.method_params:
-            query.method_params["chunk_only"] = False
-        if "doc_only" not in query.method_params:
-            query.method_params["doc_only"] = False
-        if "similarity_threshold" not in query.method_params:
-            query.method_params["similarity_threshold"] = 0.90
-        res = retriever.search(
-            query.question,
-            query.method_params["indices"],
-            query.method_params["top_k"],
-            query.method_params["similarity_threshold"],
-            query.method_params["num_hops"],
-            query.method_params["num_seen_min"],
-            query.method_params["expand"],
-            query.method_params["method"],
-            query.method_params["chunk_only"],
-            query.method_params["doc_only"],
-            query.method_params["verbose"],
-        )
-    elif query.method.lower() == "similarity":
-        if "index" not in query.method_params:
-            raise Exception("Index name not provided")
-        retriever = SimilarityRetriever(
-            embedding_service, embedding_store, get_llm_service(llm_config), conn
-        )
-        res = retriever.search(
-            query.question,
-            query.method_params["index"],
-            query.method_params["top_k"],
-            query.method_params["withHyDE"],
-            query.method_params["expand"],
-            query.method_params["verbose"],
-        )
-    elif query.method.lower() == "contextual":
-        if "index" not in query.method_params:
-            raise Exception("Index name not provided")
-        retriever = SiblingRetriever(
-            embedding_service, embedding_store, get_llm_service(llm_config), conn
-        )
-        res = retriever.search(
-            query.question,
-            query.method_params["index"],
-            query.method_params["top_k"],
-            query.method_params["lookback"],
-            query.method_params["lookahead"],
-            query.method_params["withHyDE"],
-            query.method_params["expand"],
-            query.method_params["verbose"],
-        )
-    elif query.method.lower() == "entityrelationship":
-        retriever = EntityRelationshipRetriever(
-            embedding_service, embedding_store, get_llm_service(llm_config), conn
-        )
-        res = retriever.search(query.question, query.method_params["top_k"])
-    elif query.method.lower() == "community":
-        retriever = CommunityRetriever(
-            embedding_service, embedding_store, get_llm_service(llm_config), conn
-        )
-        if "with_chunk" not in query.method_params:
-            query.method_params["with_chunk"] = True
-        if "with_doc" not in query.method_params:
-            query.method_params["with_doc"] = False
-        if "similarity_threshold" not in query.method_params:
-            query.method_params["similarity_threshold"] = 0.90
-        res = retriever.search(
-            query.question,
-            query.method_params["community_level"],
-            query.method_params["top_k"],
-            query.method_params["similarity_threshold"],
-            query.method_params["expand"],
-            query.method_params["with_chunk"],
-            query.method_params["with_doc"],
-            query.method_params["verbose"],
-        )
-    else:
-        raise Exception(f"Method {query.method} not implemented")
-    return res
+    return _dispatch(_search_handlers, query, conn)
+
+
+def _hybrid_answer(retriever, question, p: HybridParams):
+    return retriever.retrieve_answer(
+        question,
+        p.indices,
+        p.top_k,
+        p.similarity_threshold,
+        p.num_hops,
+        p.num_seen_min,
+        p.expand,
+        p.method,
+        p.chunk_only,
+        p.doc_only,
+        p.combine,
+        p.verbose,
+    )
+
+
+def _similarity_answer(retriever, question, p: SimilarityParams):
+    return retriever.retrieve_answer(
+        question, p.index, p.top_k, p.withHyDE, p.expand, p.combine, p.verbose
+    )
+
+
+def _contextual_answer(retriever, question, p: ContextualParams):
+    return retriever.retrieve_answer(
+        question,
+        p.index,
+        p.top_k,
+        p.lookback,
+        p.lookahead,
+        p.withHyDE,
+        p.expand,
+        p.combine,
+        p.verbose,
+    )
+
+
+def _entityrelationship_answer(retriever, question, p: EntityRelationshipParams):
+    return retriever.retrieve_answer(question, p.top_k)
+
+
+def _community_answer(retriever, question, p: CommunityParams):
+    return retriever.retrieve_answer(
+        question,
+        p.community_level,
+        p.top_k,
+        p.similarity_threshold,
+        p.expand,
+        p.with_chunk,
+        p.with_doc,
+        p.combine,
+        p.verbose,
+    )
+
+
+_answer_handlers = {
+    "hybrid": (HybridParams, _hybrid_answer),
+    "similarity": (SimilarityParams, _similarity_answer),
+    "contextual": (ContextualParams, _contextual_answer),
+    "entityrelationship": (EntityRelationshipParams, _entityrelationship_answer),
+    "community": (CommunityParams, _community_answer),
+}
 
 
 @router.post("/{graphname}/graphrag/answerquestion")
@@ -253,121 +407,33 @@ def answer_question(
 ):
     check_embedding_store_status()
     conn = conn.state.conn
-    resp = GraphRAGResponse
-    resp.response_type = "supportai"
-    if "combine" not in query.method_params:
-        query.method_params["combine"] = False
-    if "expand" not in query.method_params:
-        query.method_params["expand"] = False
-    if "verbose" not in query.method_params:
-        query.method_params["verbose"] = False
-    if query.method.lower() == "hybrid":
-        retriever = HybridRetriever(
-            embedding_service, embedding_store, get_llm_service(llm_config), conn
-        )
-        if "method" not in query.method_params:
-            query.method_params["method"] = "Similarity"
-        if "chunk_only" not in query.method_params:
-            query.method_params["chunk_only"] = False
-        if "doc_only" not in query.method_params:
-            query.method_params["doc_only"] = False
-        if "similarity_threshold" not in query.method_params:
-            query.method_params["similarity_threshold"] = 0.90
-        res = retriever.retrieve_answer(
-            query.question,
-            query.method_params["indices"],
-            query.method_params["top_k"],
-            query.method_params["similarity_threshold"],
-            query.method_params["num_hops"],
-            query.method_params["num_seen_min"],
-            query.method_params["expand"],
-            query.method_params["method"],
-            query.method_params["chunk_only"],
-            query.method_params["doc_only"],
-            query.method_params["combine"],
-            query.method_params["verbose"],
-        )
-    elif query.method.lower() == "similarity":
-        if "index" not in query.method_params:
-            raise Exception("Index name not provided")
-        retriever = SimilarityRetriever(
-            embedding_service, embedding_store, get_llm_service(llm_config), conn
-        )
-        res = retriever.retrieve_answer(
-            query.question,
-            query.method_params["index"],
-            query.method_params["top_k"],
-            query.method_params["withHyDE"],
-            query.method_params["expand"],
-            query.method_params["combine"],
-            query.method_params["verbose"],
-        )
-    elif query.method.lower() == "contextual":
-        if "index" not in query.method_params:
-            raise Exception("Index name not provided")
-        retriever = SiblingRetriever(
-            embedding_service, embedding_store, get_llm_service(llm_config), conn
-        )
-        res = retriever.retrieve_answer(
-            query.question,
-            query.method_params["index"],
-            query.method_params["top_k"],
-            query.method_params["lookback"],
-            query.method_params["lookahead"],
-            query.method_params["withHyDE"],
-            query.method_params["expand"],
-            query.method_params["combine"],
-            query.method_params["verbose"],
-        )
-    elif query.method.lower() == "entityrelationship":
-        retriever = EntityRelationshipRetriever(
-            embedding_service, embedding_store, get_llm_service(llm_config), conn
-        )
-        res = retriever.retrieve_answer(query.question, query.method_params["top_k"])
+    return _dispatch(_answer_handlers, query, conn)
 
-    elif query.method.lower() == "community":
-        retriever = CommunityRetriever(
-            embedding_service, embedding_store, get_llm_service(llm_config), conn
-        )
-        if "with_chunk" not in query.method_params:
-            query.method_params["with_chunk"] = True
-        if "with_doc" not in query.method_params:
-            query.method_params["with_doc"] = False
-        if "similarity_threshold" not in query.method_params:
-            query.method_params["similarity_threshold"] = 0.90
-        res = retriever.retrieve_answer(
-            query.question,
-            query.method_params["community_level"],
-            query.method_params["top_k"],
-            query.method_params["similarity_threshold"],
-            query.method_params["expand"],
-            query.method_params["with_chunk"],
-            query.method_params["with_doc"],
-            query.method_params["combine"],
-            query.method_params["verbose"],
-        )
-    else:
-        raise Exception("Method not implemented")
 
-    resp.natural_language_response = res["response"]
-    resp.query_sources = res["retrieved"]
-
-    return res
+def _make_concept_creators(conn):
+    # creating the creators installs their queries, keep the installs sequential
+    return [
+        RelationshipConceptCreator(conn, llm_config, embedding_service),
+        EntityConceptCreator(conn, llm_config, embedding_service),
+        CommunityConceptCreator(conn, llm_config, embedding_service),
+        HigherLevelConceptCreator(conn, llm_config, embedding_service),
+    ]
 
 
 @router.get("/{graphname}/supportai/buildconcepts")
-def build_concepts(
+async def build_concepts(
     graphname, conn: Request, credentials: Annotated[HTTPBase, Depends(security)]
 ):
     conn = conn.state.conn
-    rels_concepts = RelationshipConceptCreator(conn, llm_config, embedding_service)
-    rels_concepts.create_concepts()
-    ents_concepts = EntityConceptCreator(conn, llm_config, embedding_service)
-    ents_concepts.create_concepts()
-    comm_concepts = CommunityConceptCreator(conn, llm_config, embedding_service)
-    comm_concepts.create_concepts()
-    high_level_concepts = HigherLevelConceptCreator(conn, llm_config, embedding_service)
-    high_level_concepts.create_concepts()
+    *base_creators, high_level_concepts = await asyncio.to_thread(
+        _make_concept_creators, conn
+    )
+    # relationship, entity and community concepts are independent of each other,
+    # the concept tree is built on top of all of them
+    await asyncio.gather(
+        *(asyncio.to_thread(c.create_concepts) for c in base_creators)
+    )
+    await asyncio.to_thread(high_level_concepts.create_concepts)
 
     return {"status": "success"}
 
@@ -395,4 +461,6 @@ def supportai_update(
     bg_tasks.add_task(
         http_get, ecc, headers={"Authorization": conn.headers["authorization"]}
     )
+    # ECC reprocesses the graph's documents; see LLMSemanticCache for the staleness bound
+    answer_cache.invalidate(conn.state.conn.host, graphname)
     return {"status": "submitted"}
@@ -12,8 +12,15 @@ from langchain_community.callbacks.manager import get_openai_callback
 
 import re
 import logging
+from itertools import islice
+
+# GSQL output of a successful INSTALL QUERY, across TigerGraph versions
+_INSTALL_SUCCESS_MESSAGES = ("Query installation finished", "Successfully installed queries")
 
 class BaseRetriever:
+    # (host, graph, query) of queries known to be installed, shared by all retrievers
+    installed_queries = set()
+
     def __init__(
         self,
         embedding_service: EmbeddingModel,
@@ -42,14 +49,22 @@ class BaseRetriever:
         return res
 
     def _check_query_install(self, query_name):
+        key = (self.conn.host, self.conn.graphname, query_name)
+        if key in BaseRetriever.installed_queries:
+            return True
+
         endpoints = self.conn.getEndpoints(
             dynamic=True
         )  # installed queries in database
         installed_queries = [q.split("/")[-1] for q in endpoints if f"/{self.conn.graphname}/" in q]
 
         if query_name not in installed_queries:
-            return self._install_query(query_name)
+            res = self._install_query(query_name)
+            if any(msg in res for msg in _INSTALL_SUCCESS_MESSAGES):
+                BaseRetriever.installed_queries.add(key)
+            return res
         else:
+            BaseRetriever.installed_queries.add(key)
             return True
 
     def _question_to_keywords(self, question, top_k, verbose):
@@ -160,7 +175,7 @@ class BaseRetriever:
         else:
             return embedding
 
-    def _hyde_embedding(self, text, str_mode: bool = False) -> str:
+    def _hyde_document(self, text) -> str:
         model = self.llm_service.llm
         prompt = self.llm_service.hyde_prompt
 
@@ -179,25 +194,33 @@ class BaseRetriever:
             usage_data["cost"] = cb.total_cost
             self.logger.info(f"hyde_embedding usage: {usage_data}")
 
-        return self._generate_embedding(generated, str_mode)
+        return generated
+
+    def _hyde_embedding(self, text, str_mode: bool = False) -> str:
+        return self._generate_embedding(self._hyde_document(text), str_mode)
 
     """    
     def _get_entities_relationships(self, text: str, extractor: BaseExtractor):
         return extractor.extract(text)
     """
 
-    def _generate_start_set(self, questions, indices, top_k, similarity_threshold: float = 0.90, filter_expr: str = None, withHyDE: bool = False, verbose: bool = False):
+    def _embed_questions(self, questions, withHyDE: bool = False):
+        if withHyDE:
+            questions = [self._hyde_document(question) for question in questions]
+        return self.emb_service.embed_queries(questions)
+
+    def _generate_start_set(self, questions, indices, top_k, similarity_threshold: float = 0.90, filter_expr: str = None, withHyDE: bool = False, verbose: bool = False, query_embeddings=None):
         if not isinstance(questions, list):
             questions = [questions]
+        # callers searching several indices with the same questions can embed them once
+        if query_embeddings is None:
+            query_embeddings = self._embed_questions(questions, withHyDE)
+
+        if filter_expr and "\"%" in filter_expr:
+            filter_expr = re.findall(r'"(%[^"]*)"', filter_expr)[0]
 
         candidate_set = []
-        for question in questions:
-            if withHyDE:
-                query_embedding = self._hyde_embedding(question)
-            else:
-                query_embedding = self._generate_embedding(question)
-            if filter_expr and "\"%" in filter_expr:
-                filter_expr = re.findall(r'"(%[^"]*)"', filter_expr)[0]
+        for question, query_embedding in zip(questions, query_embeddings):
             res = self.embedding_store.retrieve_similar_with_score(
                 query_embedding=query_embedding,
                 top_k=top_k,
@@ -208,10 +231,13 @@ class BaseRetriever:
             verbose and self.logger.info(f"Retrived topk similar for query \"{question}\": {res}")
             candidate_set += res
         candidate_set.sort(key=lambda x: x[1], reverse=True)
-        start_set = []
-        for document, _ in candidate_set:
-            start_set.append({"v": document.metadata["vertex_id"], "t": document.metadata["vertex_type"]})
-        start_set = [dict(d) for d in {tuple(vt.items()) for vt in start_set}][:top_k]
+        # dedupe in score order, so a vertex hit by several questions keeps its
+        # best rank and the top_k cut keeps the best matches
+        best = dict.fromkeys(
+            (document.metadata["vertex_id"], document.metadata["vertex_type"])
+            for document, _ in candidate_set
+        )
+        start_set = [{"v": v, "t": t} for v, t in islice(best, top_k)]
         verbose and self.logger.info(f"Returning start_set: {str(start_set)}")
         return start_set
 
@@ -1,4 +1,4 @@
-import json
+import orjson
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
@@ -38,7 +38,7 @@ class CommunityRetriever(BaseRetriever):
     ):
         super().__init__(embedding_service, embedding_store, llm_service, connection)
 
-    def search(self, question, community_level: int, top_k: int = 5, similarity_threshold = 0.90, expand: bool = False, with_chunk: bool = True, with_doc: bool = False, verbose: bool = False):
+    def search(self, question, community_level: int, top_k: int = 5, similarity_threshold = 0.90, expand: bool = False, with_chunk: bool = True, with_doc: bool = False, verbose: bool = False, query_embedding=None):
         if expand:
             questions = self._expand_question(question, top_k, verbose=verbose)
             verbose and self.logger.info(f"Expanded questions to use: {questions}")
@@ -47,14 +47,15 @@ class CommunityRetriever(BaseRetriever):
             for i in range(1, community_level+1):
                 filter_expr += f"_{i}"
             filter_expr += "\""  
-            start_set = self._generate_start_set(questions, ["Community"], top_k, similarity_threshold, filter_expr=filter_expr, verbose=verbose)
+            query_embeddings = self._embed_questions(questions)
+            start_set = self._generate_start_set(questions, ["Community"], top_k, similarity_threshold, filter_expr=filter_expr, verbose=verbose, query_embeddings=query_embeddings)
             verbose and self.logger.info(f"Searching with start_set: {str(start_set)}")
 
             self._check_query_install("GraphRAG_Community_Search")
             res = self.conn.runInstalledQuery(
                 "GraphRAG_Community_Search",
                 params = {
-                    "json_list_vts": str(start_set),
+                    "json_list_vts": orjson.dumps(start_set).decode(),
                     "community_level": community_level,
                     "with_chunk": with_chunk,
                     "with_doc": with_doc,
@@ -65,21 +66,24 @@ class CommunityRetriever(BaseRetriever):
 
             # Include similarity search results
             if with_chunk or with_doc:
-                start_set = self._generate_start_set(questions, ["DocumentChunk"], top_k, similarity_threshold)
+                start_set = self._generate_start_set(questions, ["DocumentChunk"], top_k, similarity_threshold, query_embeddings=query_embeddings)
 
                 self._check_query_install("Content_Similarity_Search")
                 resp = self.conn.runInstalledQuery(
                     "Content_Similarity_Search",
                     params = {
-                        "json_list_vts": str(start_set),
+                        "json_list_vts": orjson.dumps(start_set).decode(),
                         "v_type": "DocumentChunk",
                         "verbose": verbose,
                     },
                     usePost=True
                 )
-                res[0]["final_retrieval"]["Similarity_Context"] = [resp[0]["final_retrieval"][x] for x in resp[0]["final_retrieval"]]
+                res[0]["final_retrieval"]["Similarity_Context"] = list(resp[0]["final_retrieval"].values())
         else:
-            query_vector = self._generate_embedding(question)
+            if query_embedding is not None:
+                query_vector = query_embedding
+            else:
+                query_vector = self._generate_embedding(question)
 
             self._check_query_install("GraphRAG_Community_Vector_Search")
             res = self.conn.runInstalledQuery(
@@ -96,7 +100,7 @@ class CommunityRetriever(BaseRetriever):
                 usePost=True
             )
         if len(res) > 1 and "verbose" in res[1]:
-            verbose_info = json.dumps(res[1]['verbose'])
+            verbose_info = orjson.dumps(res[1]["verbose"]).decode()
             self.logger.info(f"Retrived GraphRAG query verbose info: {verbose_info}")
             if expand:
                 res[1]["verbose"]["expanded_questions"] = questions
@@ -157,7 +161,7 @@ class CommunityRetriever(BaseRetriever):
                 context += retrieved[0]["final_retrieval"][x]
             context = ["\n".join(set(context))]
         else:
-            context = ["\n".join(retrieved[0]["final_retrieval"][x]) for x in retrieved[0]["final_retrieval"]]
+            context = ["\n".join(x) for x in retrieved[0]["final_retrieval"].values()]
 
         with ThreadPoolExecutor() as executor:
             res = executor.submit(self.gather_candidates, question, context).result()
@@ -1,4 +1,4 @@
-import json
+import orjson
 from supportai.retrievers import BaseRetriever
 from common.metrics.tg_proxy import TigerGraphConnectionProxy
 
@@ -12,7 +12,7 @@ class HybridRetriever(BaseRetriever):
     ):
         super().__init__(embedding_service, embedding_store, llm_service, connection)
 
-    def search(self, question, indices, top_k=1, similarity_threshold=0.90, num_hops=2, num_seen_min=1, expand = False, method = "similarity", chunk_only=False, doc_only=False, verbose=False):
+    def search(self, question, indices, top_k=1, similarity_threshold=0.90, num_hops=2, num_seen_min=1, expand = False, method = "similarity", chunk_only=False, doc_only=False, verbose=False, query_embedding=None):
         if expand:
             questions = self._expand_question(question, top_k, verbose)
             verbose and self.logger.info(f"Expanded questions to use: {questions}")
@@ -50,7 +50,7 @@ class HybridRetriever(BaseRetriever):
             res = self.conn.runInstalledQuery(
                 "GraphRAG_Hybrid_Search",
                 params = {
-                    "json_list_vts": str(start_set),
+                    "json_list_vts": orjson.dumps(start_set).decode(),
                     "num_hops": num_hops,
                     "num_seen_min": num_seen_min,
                     "chunk_only": chunk_only,
@@ -60,7 +60,10 @@ class HybridRetriever(BaseRetriever):
                 usePost=True
             )  
         else:
-            query_vector = self._generate_embedding(question)        
+            if query_embedding is not None:
+                query_vector = query_embedding
+            else:
+                query_vector = self._generate_embedding(question)
             self._check_query_install("GraphRAG_Hybrid_Vector_Search")
             res = self.conn.runInstalledQuery(
                 "GraphRAG_Hybrid_Vector_Search",
@@ -78,7 +81,7 @@ class HybridRetriever(BaseRetriever):
                 usePost=True
             )  
         if len(res) > 1 and "verbose" in res[1]:
-            verbose_info = json.dumps(res[1]['verbose'])
+            verbose_info = orjson.dumps(res[1]["verbose"]).decode()
             self.logger.info(f"Retrived HybridSearch query verbose info: {verbose_info}")
             if expand:
                 res[1]["verbose"]["expanded_questions"] = questions
@@ -93,7 +96,7 @@ class HybridRetriever(BaseRetriever):
                 context += retrieved[0]["final_retrieval"][x]
             context = ["\n".join(set(context))]
         else:
-            context = ["\n".join(retrieved[0]["final_retrieval"][x]) for x in retrieved[0]["final_retrieval"]]
+            context = ["\n".join(x) for x in retrieved[0]["final_retrieval"].values()]
 
         resp = self._generate_response(question, context, verbose)
         
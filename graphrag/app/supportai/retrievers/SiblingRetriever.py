@@ -1,4 +1,4 @@
-import json
+import orjson
 from supportai.retrievers import BaseRetriever
 from common.metrics.tg_proxy import TigerGraphConnectionProxy
 
@@ -13,7 +13,7 @@ class SiblingRetriever(BaseRetriever):
     ):
         super().__init__(embedding_service, embedding_store, llm_service, connection)
 
-    def search(self, question, index, top_k=1, lookback=3, lookahead=3, expand=False, withHyDE=False, verbose=False):
+    def search(self, question, index, top_k=1, lookback=3, lookahead=3, expand=False, withHyDE=False, verbose=False, query_embedding=None):
         if expand:
             questions = self._expand_question(question, top_k, verbose)
             verbose and self.logger.info(f"Expanded questions to use: {questions}")
@@ -25,7 +25,7 @@ class SiblingRetriever(BaseRetriever):
             res = self.conn.runInstalledQuery(
                 "Chunk_Sibling_Search",
                 params = {
-                    "json_list_vts": str(start_set),
+                    "json_list_vts": orjson.dumps(start_set).decode(),
                     "v_type": index,
                     "lookback": lookback,
                     "lookahead": lookahead,
@@ -36,6 +36,8 @@ class SiblingRetriever(BaseRetriever):
         else:
             if withHyDE:
                 query_vector = self._hyde_embedding(question)
+            elif query_embedding is not None:
+                query_vector = query_embedding
             else:
                 query_vector = self._generate_embedding(question)
 
@@ -53,7 +55,7 @@ class SiblingRetriever(BaseRetriever):
                 usePost=True
             )
         if len(res) > 1 and "verbose" in res[1]:
-            verbose_info = json.dumps(res[1]['verbose'])
+            verbose_info = orjson.dumps(res[1]["verbose"]).decode()
             self.logger.info(f"Retrived SiblingSearch query verbose info: {verbose_info}")
             if expand:
                 res[1]["verbose"]["expanded_questions"] = questions
@@ -62,7 +64,7 @@ class SiblingRetriever(BaseRetriever):
     def retrieve_answer(
         self, question, index, top_k=1, lookback=3, lookahead=3, withHyDE=False, expand=False, combine=False, verbose=False
     ):
-        retrieved = self.search(question, index, top_k, lookback, lookahead, withHyDE, expand, verbose)
+        retrieved = self.search(question, index, top_k, lookback, lookahead, expand=expand, withHyDE=withHyDE, verbose=verbose)
         content = {}
         for x in retrieved[0]["final_retrieval"]:
             content[x] = [retrieved[0]["final_retrieval"][x][y]["content"] for y in retrieved[0]["final_retrieval"][x]]
@@ -1,7 +1,10 @@
-import json
+import orjson
 from supportai.retrievers import BaseRetriever
+from supportai.retrievers._cache import LLMSemanticCache
 from common.metrics.tg_proxy import TigerGraphConnectionProxy
 
+answer_cache = LLMSemanticCache()
+
 
 class SimilarityRetriever(BaseRetriever):
     def __init__(
@@ -13,7 +16,7 @@ class SimilarityRetriever(BaseRetriever):
     ):
         super().__init__(embedding_service, embedding_store, llm_service, connection)
 
-    def search(self, question, index, top_k=1, withHyDE=False, expand=False, verbose=False):
+    def search(self, question, index, top_k=1, withHyDE=False, expand=False, verbose=False, query_embedding=None):
         if expand:
             questions = self._expand_question(question, top_k, verbose)
             verbose and self.logger.info(f"Expanded questions to use: {questions}")
@@ -25,7 +28,7 @@ class SimilarityRetriever(BaseRetriever):
             res = self.conn.runInstalledQuery(
                 "Content_Similarity_Search",
                 params = {
-                    "json_list_vts": str(start_set),
+                    "json_list_vts": orjson.dumps(start_set).decode(),
                     "v_type": index,
                     "verbose": verbose,
                 },
@@ -34,6 +37,8 @@ class SimilarityRetriever(BaseRetriever):
         else:
             if withHyDE:
                 query_vector = self._hyde_embedding(question)
+            elif query_embedding is not None:
+                query_vector = query_embedding
             else:
                 query_vector = self._generate_embedding(question)
 
@@ -49,15 +54,26 @@ class SimilarityRetriever(BaseRetriever):
                 usePost=True
             )
         if len(res) > 1 and "verbose" in res[1]:
-            verbose_info = json.dumps(res[1]['verbose'])
+            verbose_info = orjson.dumps(res[1]["verbose"]).decode()
             self.logger.info(f"Retrived SimilaritySearch query verbose info: {verbose_info}")
             if expand:
                 res[1]["verbose"]["expanded_questions"] = questions
         return res
 
     def retrieve_answer(self, question, index, top_k=1, withHyDE=False, expand=False, combine=False, verbose=False):
-        retrieved = self.search(question, index, top_k, withHyDE, expand, verbose)
-        context = [retrieved[0]["final_retrieval"][x] for x in retrieved[0]["final_retrieval"]]
+        # HyDE and question expansion depend on LLM output, only cache plain lookups
+        use_cache = not (verbose or expand or withHyDE)
+        query_embedding = None
+        if use_cache:
+            query_embedding = self._generate_embedding(question)
+            cache_key = answer_cache.cache_key(self.conn.host, self.conn.graphname, index, top_k, combine)
+            cached = answer_cache.get(cache_key, query_embedding)
+            if cached is not None:
+                self.logger.info("Returning cached SimilaritySearch answer")
+                return cached
+
+        retrieved = self.search(question, index, top_k, withHyDE, expand, verbose, query_embedding=query_embedding)
+        context = list(retrieved[0]["final_retrieval"].values())
         if combine:
             context = ["\n".join(context)]
 
@@ -67,4 +83,7 @@ class SimilarityRetriever(BaseRetriever):
             resp["verbose"] = retrieved[1]["verbose"]
             resp["verbose"]["final_retrieval"] = retrieved[0]["final_retrieval"]
 
+        if use_cache:
+            answer_cache.set(cache_key, query_embedding, resp)
+
         return resp
@@ -0,0 +1,115 @@
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
+
+class LLMSemanticCache:
+    """Bounded in-memory cache of retriever answers, looked up by question similarity.
+
+    Entries are grouped under a key built from the deterministic retrieval
+    parameters. Within a key, a cached answer is returned when the cosine
+    similarity between the new question embedding and a cached one is at least
+    `similarity_threshold`.
+
+    A graph's entries are invalidated when its documents are loaded, but ECC
+    chunks and embeds them asynchronously afterwards, and this service is not
+    told when that ends. An answer cached while ECC is still processing can
+    therefore be stale for up to `ttl` seconds after processing finishes.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = 128,
+        max_entries_per_key: int = 64,
+        similarity_threshold: float = 0.97,
+        ttl: float = 600,
+    ):
+        self.max_keys = max_keys
+        self.max_entries_per_key = max_entries_per_key
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self._buckets = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def cache_key(host: str, graphname: str, *params) -> tuple:
+        """Key of the graph's entries for the given retrieval parameters."""
+        return (
+            host,
+            graphname,
+            hashlib.sha256(
+                json.dumps(params, sort_keys=True, default=str).encode()
+            ).hexdigest(),
+        )
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def _expire(self, bucket, now):
+        keep = [i for i, t in enumerate(bucket["times"]) if now - t < self.ttl]
+        if len(keep) != len(bucket["times"]):
+            bucket["vectors"] = bucket["vectors"][keep]
+            bucket["values"] = [bucket["values"][i] for i in keep]
+            bucket["times"] = [bucket["times"][i] for i in keep]
+
+    def get(self, key: tuple, embedding):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return None
+            self._expire(bucket, time.time())
+            if len(bucket["values"]) == 0:
+                del self._buckets[key]
+                return None
+            self._buckets.move_to_end(key)
+
+            scores = bucket["vectors"] @ self._normalize(embedding)
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+            value = bucket["values"][best]
+        return copy.deepcopy(value)
+
+    def set(self, key: tuple, embedding, value):
+        vec = self._normalize(embedding)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket["vectors"].shape[1] != vec.shape[0]:
+                bucket = {
+                    "vectors": np.empty((0, vec.shape[0]), dtype=np.float32),
+                    "values": [],
+                    "times": [],
+                }
+                self._buckets[key] = bucket
+            self._buckets.move_to_end(key)
+
+            bucket["vectors"] = np.vstack([bucket["vectors"], vec])[
+                -self.max_entries_per_key :
+            ]
+            bucket["values"] = (bucket["values"] + [copy.deepcopy(value)])[
+                -self.max_entries_per_key :
+            ]
+            bucket["times"] = (bucket["times"] + [time.time()])[
+                -self.max_entries_per_key :
+            ]
+
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+    def invalidate(self, host: str, graphname: str):
+        """Drop every cached answer of a graph, e.g. after its documents changed."""
+        with self._lock:
+            for key in [k for k in self._buckets if k[:2] == (host, graphname)]:
+                del self._buckets[key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
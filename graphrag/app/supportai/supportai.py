@@ -1,11 +1,13 @@
-import os
-import json
+import re
+import orjson
 import uuid
 import logging
+from importlib import resources
 
 from pyTigerGraph import TigerGraphConnection
 
 from common.config import embedding_dimension
+from common.db.tg_utils import install_gds, parse_tg_version
 from common.py_schemas.schemas import (
     # GraphRAGResponse,
     CreateIngestConfig,
@@ -17,93 +19,161 @@ from common.py_schemas.schemas import (
 
 logger = logging.getLogger(__name__)
 
+SUPPORTAI_QUERIES = [
+    "common/gsql/supportai/Scan_For_Updates.gsql",
+    "common/gsql/supportai/Update_Vertices_Processing_Status.gsql",
+    "common/gsql/supportai/Selected_Set_Display.gsql",
+    "common/gsql/supportai/retrievers/GraphRAG_Hybrid_Search_Display.gsql",
+    "common/gsql/supportai/retrievers/GraphRAG_Community_Search_Display.gsql",
+    "common/gsql/supportai/retrievers/Chunk_Sibling_Search.gsql",
+    "common/gsql/supportai/retrievers/Content_Similarity_Search.gsql",
+    "common/gsql/supportai/retrievers/GraphRAG_Hybrid_Search.gsql",
+    "common/gsql/supportai/retrievers/GraphRAG_Community_Search.gsql",
+]
+
+SUPPORTAI_VECTOR_QUERIES = [
+    "common/gsql/supportai/retrievers/Content_Similarity_Vector_Search.gsql",
+    "common/gsql/supportai/retrievers/Chunk_Sibling_Vector_Search.gsql",
+    "common/gsql/supportai/retrievers/GraphRAG_Community_Vector_Search.gsql",
+    "common/gsql/supportai/retrievers/GraphRAG_Hybrid_Vector_Search.gsql",
+]
+
+
+def _load_templates(directory, prefix: str) -> dict[str, str]:
+    templates = {}
+    for entry in directory.iterdir():
+        path = f"{prefix}/{entry.name}"
+        if entry.is_dir():
+            templates.update(_load_templates(entry, path))
+        elif entry.name.endswith(".gsql"):
+            templates[path] = entry.read_text()
+    return templates
+
+
+# every SupportAI template, read once at import and keyed by its repo path
+_TEMPLATES = _load_templates(
+    resources.files("common").joinpath("gsql", "supportai"), "common/gsql/supportai"
+)
+
+
+def _read_template(path: str) -> str:
+    template = _TEMPLATES.get(path)
+    if template is None:
+        with open(path, "r") as f:
+            template = f.read()
+    return template
+
+
+_ID_RE = re.compile(r":\s*\[?\s*([^\s\].]+)")
+
+# markers in a graph's `ls` output of the SupportAI schema, vector schema and indexes
+_SCHEMA_MARKER = "- VERTEX ResolvedEntity"
+_VECTOR_MARKER = "- embedding(Dimension="
+_INDEX_MARKER = "- doc_chunk_epoch_processed_index"
+_INIT_STATE_RE = re.compile(
+    "|".join(map(re.escape, (_SCHEMA_MARKER, _VECTOR_MARKER, _INDEX_MARKER)))
+)
+
+# data source connector type and {connector key: data_source_config key} per source
+_CONNECTOR_FIELDS = {
+    "s3": ("s3", {"access.key": "aws_access_key", "secret.key": "aws_secret_key"}),
+    "azure_key": ("abs", {"account.key": "account_key"}),
+    "azure_oauth": (
+        "abs",
+        {"client.id": "client_id", "client.secret": "client_secret", "tenant.id": "tenant_id"},
+    ),
+    "gcs": (
+        "gcs",
+        {
+            "project_id": "project_id",
+            "private_key_id": "private_key_id",
+            "private_key": "private_key",
+            "client_email": "client_email",
+        },
+    ),
+}
+
+
+def _make_connector(connector_type: str, data_conn: dict) -> dict:
+    conn_type, fields = _CONNECTOR_FIELDS[connector_type]
+    missing = [key for key in fields.values() if data_conn.get(key) is None]
+    if missing:
+        raise Exception(f"{', '.join(missing)} not provided for the {connector_type} data source")
+    return {"type": conn_type, **{name: data_conn[key] for name, key in fields.items()}}
+
+
 def init_supportai(conn: TigerGraphConnection, graphname: str) -> tuple[dict, dict]:
     # need to open the file using the absolute path
-    ver = conn.getVer().split(".")
+    ver = conn.getVer()
+    version = parse_tg_version(ver)
 
     current_schema = conn.gsql("""USE GRAPH {}\n ls""".format(graphname))
 
-    supportai_queries = [
-        "common/gsql/supportai/Scan_For_Updates.gsql",
-        "common/gsql/supportai/Update_Vertices_Processing_Status.gsql",
-        "common/gsql/supportai/Selected_Set_Display.gsql",
-        "common/gsql/supportai/retrievers/GraphRAG_Hybrid_Search_Display.gsql",
-        "common/gsql/supportai/retrievers/GraphRAG_Community_Search_Display.gsql",
-        "common/gsql/supportai/retrievers/Chunk_Sibling_Search.gsql",
-        "common/gsql/supportai/retrievers/Content_Similarity_Search.gsql",
-        "common/gsql/supportai/retrievers/GraphRAG_Hybrid_Search.gsql",
-        "common/gsql/supportai/retrievers/GraphRAG_Community_Search.gsql",
-    ]
-
-    if "- VERTEX ResolvedEntity" in current_schema:
-        schema_res="Schema already exists, skipped"
+    supportai_queries = list(SUPPORTAI_QUERIES)
+    # find which parts already exist in one pass over the schema
+    existing = set(_INIT_STATE_RE.findall(current_schema))
+
+    if _SCHEMA_MARKER in existing:
+        schema_res = ["Schema already exists, skipped"]
     else:
-        file_path = "common/gsql/supportai/SupportAI_Schema.gsql"
-        with open(file_path, "r") as f:
-            schema = f.read()
-        schema_res = conn.gsql(
-            """USE GRAPH {}\n{}\nRUN SCHEMA_CHANGE JOB add_supportai_schema""".format(
-                graphname, schema
+        schema = _read_template("common/gsql/supportai/SupportAI_Schema.gsql")
+        schema_res = [
+            conn.gsql(
+                """USE GRAPH {}\n{}\nRUN SCHEMA_CHANGE JOB add_supportai_schema""".format(
+                    graphname, schema
+                )
             )
-        )
+        ]
 
-    if "- embedding(Dimension=" in current_schema:
-        schema_res+=" Embeddding schema already exists, skipped"
+    if _VECTOR_MARKER in existing:
+        schema_res.append(" Embeddding schema already exists, skipped")
     else:
-        if int(ver[0]) >= 4 and int(ver[1]) >= 2:
-            file_path = "common/gsql/supportai/SupportAI_Schema_Native_Vector.gsql"
-            with open(file_path, "r") as f:
-                schema = f.read()
+        if version >= (4, 2):
+            schema = _read_template(
+                "common/gsql/supportai/SupportAI_Schema_Native_Vector.gsql"
+            )
             if embedding_dimension != 1536:
                 schema = schema.replace(
                     "dimension=1536",
                     f"dimension={embedding_dimension}",
                 )
-            schema_res += " "
-            schema_res += conn.gsql(
-                """USE GRAPH {}\n{}\nRUN SCHEMA_CHANGE JOB add_supportai_vector""".format(
-                    graphname, schema
+            schema_res.append(" ")
+            schema_res.append(
+                conn.gsql(
+                    """USE GRAPH {}\n{}\nRUN SCHEMA_CHANGE JOB add_supportai_vector""".format(
+                        graphname, schema
+                    )
                 )
             )
 
-            logger.info(f"Installing GDS library")
-            q_res = conn.gsql(
-                """USE GLOBAL\nimport package gds\ninstall function gds.**"""
-            )
-            logger.info(f"Done installing GDS library with status {q_res}")
-
-            supportai_queries.extend([
-                "common/gsql/supportai/retrievers/Content_Similarity_Vector_Search.gsql",
-                "common/gsql/supportai/retrievers/Chunk_Sibling_Vector_Search.gsql",
-                "common/gsql/supportai/retrievers/GraphRAG_Community_Vector_Search.gsql",
-                "common/gsql/supportai/retrievers/GraphRAG_Hybrid_Vector_Search.gsql",
-            ])
+            install_gds(conn)
+
+            supportai_queries.extend(SUPPORTAI_VECTOR_QUERIES)
         else:
             raise Exception(f"Vector feature is not supported by the current TigerGraph version: {ver}")
 
-    if "- doc_chunk_epoch_processed_index" in current_schema:
+    if _INDEX_MARKER in existing:
         index_res="Index already exists, skipped"
     else:
-        file_path = "common/gsql/supportai/SupportAI_IndexCreation.gsql"
-        with open(file_path) as f:
-            index = f.read()
+        index = _read_template("common/gsql/supportai/SupportAI_IndexCreation.gsql")
         index_res = conn.gsql(
             """USE GRAPH {}\n{}\nRUN SCHEMA_CHANGE JOB add_supportai_indexes""".format(
                 graphname, index
             )
         )
 
-    for filename in supportai_queries:
-        logger.info(f"Creating supportai query {filename}")
-        with open(f"{filename}", "r") as f:
-            q_body = f.read()
-        q_name, extension = os.path.splitext(os.path.basename(filename))
-        q_res = conn.gsql(
-            """USE GRAPH {}\nBEGIN\n{}\nEND\n""".format(
-                conn.graphname, q_body
-            )
+    # one GSQL script creates every query, instead of a round-trip per query
+    logger.info(f"Creating supportai queries {supportai_queries}")
+    q_res = conn.gsql(
+        "USE GRAPH {}\n{}".format(
+            conn.graphname,
+            "".join(
+                "BEGIN\n{}\nEND\n".format(_read_template(filename))
+                for filename in supportai_queries
+            ),
         )
-        logger.info(f"Done creating supportai query {q_name} with status {q_res}")
+    )
+    logger.info(f"Done creating supportai queries with status {q_res}")
 
     logger.info(f"Installing supportai queries all together")
     query_res = conn.gsql(
@@ -113,7 +183,21 @@ def init_supportai(conn: TigerGraphConnection, graphname: str) -> tuple[dict, di
     )
     logger.info(f"Done installing supportai query all with status {query_res}")
 
-    return schema_res, index_res, query_res
+    return "".join(schema_res), index_res, query_res
+
+
+def _fill_template(template: str, substitutions: dict) -> str:
+    """Replace every key of substitutions in the template in a single pass."""
+    pattern = re.compile("|".join(map(re.escape, substitutions)))
+    return pattern.sub(lambda m: substitutions[m.group(0)], template)
+
+
+def _parse_created_id(gsql_output: str) -> str:
+    """Return the name GSQL reports after 'created ...:', e.g. 'jobs: [name].'"""
+    m = _ID_RE.search(gsql_output)
+    if m is None:
+        raise Exception(f"Could not find the created id in the GSQL output: {gsql_output}")
+    return m.group(1)
 
 
 def create_ingest(
@@ -122,37 +206,44 @@ def create_ingest(
     conn: TigerGraphConnection,
 ):
     if ingest_config.file_format.lower() == "json":
-        file_path = "common/gsql/supportai/SupportAI_InitialLoadJSON.gsql"
-
-        with open(file_path) as f:
-            ingest_template = f.read()
-        ingest_template = ingest_template.replace("@uuid@", str(uuid.uuid4().hex))
+        ingest_template = _read_template(
+            "common/gsql/supportai/SupportAI_InitialLoadJSON.gsql"
+        )
         doc_id = ingest_config.loader_config.get("doc_id_field", "doc_id")
         doc_text = ingest_config.loader_config.get("content_field", "content")
         doc_type = ingest_config.loader_config.get("doc_type", "")
-        ingest_template = ingest_template.replace('"doc_id"', '"{}"'.format(doc_id))
-        ingest_template = ingest_template.replace('"content"', '"{}"'.format(doc_text))
-        ingest_template = ingest_template.replace('"doc_type"', '"{}"'.format(doc_type))
+        ingest_template = _fill_template(
+            ingest_template,
+            {
+                "@uuid@": uuid.uuid4().hex,
+                '"doc_id"': '"{}"'.format(doc_id),
+                '"content"': '"{}"'.format(doc_text),
+                '"doc_type"': '"{}"'.format(doc_type),
+            },
+        )
 
     if ingest_config.file_format.lower() == "csv":
-        file_path = "common/gsql/supportai/SupportAI_InitialLoadCSV.gsql"
-
-        with open(file_path) as f:
-            ingest_template = f.read()
-        ingest_template = ingest_template.replace("@uuid@", str(uuid.uuid4().hex))
-        separator = ingest_config.get("separator", "|")
-        header = ingest_config.get("header", "true")
-        eol = ingest_config.get("eol", "\n")
-        quote = ingest_config.get("quote", "double")
-        ingest_template = ingest_template.replace('"|"', '"{}"'.format(separator))
-        ingest_template = ingest_template.replace('"true"', '"{}"'.format(header))
-        ingest_template = ingest_template.replace('"\\n"', '"{}"'.format(eol))
-        ingest_template = ingest_template.replace('"double"', '"{}"'.format(quote))
-
-    file_path = "common/gsql/supportai/SupportAI_DataSourceCreation.gsql"
+        ingest_template = _read_template(
+            "common/gsql/supportai/SupportAI_InitialLoadCSV.gsql"
+        )
+        separator = ingest_config.loader_config.get("separator", "|")
+        header = ingest_config.loader_config.get("header", "true")
+        eol = ingest_config.loader_config.get("eol", "\\n")
+        quote = ingest_config.loader_config.get("quote", "double")
+        ingest_template = _fill_template(
+            ingest_template,
+            {
+                "@uuid@": uuid.uuid4().hex,
+                '"|"': '"{}"'.format(separator),
+                '"true"': '"{}"'.format(header),
+                '"\\n"': '"{}"'.format(eol),
+                '"double"': '"{}"'.format(quote),
+            },
+        )
 
-    with open(file_path) as f:
-        data_stream_conn = f.read()
+    data_stream_conn = _read_template(
+        "common/gsql/supportai/SupportAI_DataSourceCreation.gsql"
+    )
 
     # assign unique identifier to the data stream connection
 
@@ -161,86 +252,41 @@ def create_ingest(
     )
 
     # check the data source and create the appropriate connection
-    res = {"data_source": ingest_config.data_source.lower()}
-
-    if ingest_config.data_source.lower() == "s3":
-        data_conn = ingest_config.data_source_config
-        if (
-            data_conn.get("aws_access_key") is None
-            or data_conn.get("aws_secret_key") is None
-        ):
-            raise Exception("AWS credentials not provided")
-        connector = {
-            "type": "s3",
-            "access.key": data_conn["aws_access_key"],
-            "secret.key": data_conn["aws_secret_key"],
-        }
-
-        data_stream_conn = data_stream_conn.replace(
-            "@source_config@", json.dumps(connector)
-        )
+    data_source = ingest_config.data_source.lower()
+    res = {"data_source": data_source}
 
-    elif ingest_config.data_source.lower() == "azure":
-        if ingest_config.data_source_config.get("account_key") is not None:
-            connector = {
-                "type": "abs",
-                "account.key": ingest_config.data_source_config["account_key"],
-            }
-        elif ingest_config.data_source_config.get("client_id") is not None:
-            # verify that the client secret is also provided
-            if ingest_config.data_source_config.get("client_secret") is None:
-                raise Exception("Client secret not provided")
-            # verify that the tenant id is also provided
-            if ingest_config.data_source_config.get("tenant_id") is None:
-                raise Exception("Tenant id not provided")
-            connector = {
-                "type": "abs",
-                "client.id": ingest_config.data_source_config["client_id"],
-                "client.secret": ingest_config.data_source_config["client_secret"],
-                "tenant.id": ingest_config.data_source_config["tenant_id"],
-            }
+    data_conn = ingest_config.data_source_config
+    if data_source == "azure":
+        if data_conn.get("account_key") is not None:
+            connector_type = "azure_key"
+        elif data_conn.get("client_id") is not None:
+            connector_type = "azure_oauth"
         else:
             raise Exception("Azure credentials not provided")
-        data_stream_conn = data_stream_conn.replace(
-            "@source_config@", json.dumps(connector)
-        )
-    elif ingest_config.data_source.lower() == "gcs":
-        # verify that the correct fields are provided
-        if ingest_config.data_source_config.get("project_id") is None:
-            raise Exception("Project id not provided")
-        if ingest_config.data_source_config.get("private_key_id") is None:
-            raise Exception("Private key id not provided")
-        if ingest_config.data_source_config.get("private_key") is None:
-            raise Exception("Private key not provided")
-        if ingest_config.data_source_config.get("client_email") is None:
-            raise Exception("Client email not provided")
-        connector = {
-            "type": "gcs",
-            "project_id": ingest_config.data_source_config["project_id"],
-            "private_key_id": ingest_config.data_source_config["private_key_id"],
-            "private_key": ingest_config.data_source_config["private_key"],
-            "client_email": ingest_config.data_source_config["client_email"],
-        }
-        data_stream_conn = data_stream_conn.replace(
-            "@source_config@", json.dumps(connector)
-        )
-    elif ingest_config.data_source.lower() == "local":
-        pass
+    elif data_source in ("s3", "gcs"):
+        connector_type = data_source
+    elif data_source == "local":
+        connector_type = None
     else:
         raise Exception("Data source not implemented")
 
+    if connector_type is not None:
+        data_stream_conn = data_stream_conn.replace(
+            "@source_config@", orjson.dumps(_make_connector(connector_type, data_conn)).decode()
+        )
+
     load_job_created = conn.gsql("USE GRAPH {}\n".format(graphname) + ingest_template)
 
-    res["load_job_id"] = load_job_created.split(":")[1].strip(" [").strip(" ").strip(".").strip("]")
+    res["load_job_id"] = _parse_created_id(load_job_created)
     if ingest_config.data_source_config:
         res["data_path"] = ingest_config.data_source_config.get("data_path", "")
 
-    if ingest_config.data_source.lower() == "local":
+    if data_source == "local":
         res["data_source_id"] = "DocumentContent"
     else:
         data_source_created = conn.gsql(
             "USE GRAPH {}\n".format(graphname) + data_stream_conn
         )
-        res["data_source_id"] = data_source_created.split(":")[1].strip(" [").strip(" ").strip(".").strip("]")
+        res["data_source_id"] = _parse_created_id(data_source_created)
 
     return res
@@ -12,15 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import logging
 from typing import Iterable
 from langchain_community.callbacks.manager import get_openai_callback
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable
 from langchain.prompts import PromptTemplate
 from langchain.tools import BaseTool
 from langchain.llms.base import LLM
 from common.metrics.tg_proxy import TigerGraphConnectionProxy
-from common.db.connections import get_schema_ver
+from .schema_rep import get_schema_rep
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +37,10 @@ class GenerateCypher(BaseTool):
     llm: LLM = None
     schema_rep: str = None
     schema_ver: int = None
+    prompt: PromptTemplate = None
+    chain: Runnable = None
+    query_header: str = None
+    query_footer: str = "\n}"
 
     def __init__(self, conn: TigerGraphConnectionProxy, llm):
         """Initialize GenerateCypher.
@@ -49,54 +55,25 @@ class GenerateCypher(BaseTool):
         super().__init__()
         self.conn = conn
         self.llm = llm
+        # the prompt and chain don't depend on the question, build them once
+        self.prompt = PromptTemplate(
+            template=llm.generate_cypher_prompt,
+            input_variables=[
+                "question",
+                "schema",
+                "history"
+            ]
+        )
+        self.chain = self.prompt | llm.model | StrOutputParser()
+        # the graph is fixed for the tool's lifetime, so is the query wrapper
+        self.query_header = f"USE GRAPH {conn.graphname} \nINTERPRET OPENCYPHER QUERY () {{\n"
         self.schema_rep = ""
         self.schema_ver = -1
 
     def _generate_schema_rep(self):
-        schema_ver = get_schema_ver(self.conn)
-        if schema_ver is not None and self.schema_ver == schema_ver:
-            logger.info(f"Reusing existing schema rep for schema version {schema_ver}")
-            return self.schema_rep
-        verts = self.conn.getVertexTypes()
-        edges = self.conn.getEdgeTypes()
-        vertex_schema = []
-        for vert in verts:
-            primary_id = self.conn.getVertexType(vert)["PrimaryId"]["AttributeName"]
-            attributes = "\n\t\t".join([attr["AttributeName"] + " of type " + attr["AttributeType"]["Name"] 
-                                        for attr in self.conn.getVertexType(vert)["Attributes"]])
-            if attributes == "":
-                attributes = "No attributes"
-            vertex_schema.append(f"{vert}\n\tPrimary Id Attribute: {primary_id}\n\tAttributes: \n\t\t{attributes}")
-
-        edge_schema = []
-        for edge in edges:
-            from_vertex = self.conn.getEdgeType(edge)["FromVertexTypeName"]
-            to_vertex = self.conn.getEdgeType(edge)["ToVertexTypeName"]
-            direction = "Directed" if self.conn.getEdgeType(edge)["IsDirected"] else "Undirected"
-            #reverse_edge = conn.getEdgeType(edge)["Config"].get("REVERSE_EDGE")
-            attributes = "\n\t\t".join([attr["AttributeName"] + " of type " + attr["AttributeType"]["Name"] 
-                                        for attr in self.conn.getEdgeType(edge)["Attributes"]])
-            if attributes == "":
-                attributes = "No attributes"
-            if from_vertex == "*" or to_vertex == "*":
-                edge_pairs = self.conn.getEdgeType(edge)["EdgePairs"]
-                for an_edge in edge_pairs:
-                    edge_info = f"""From Vertex: {an_edge["From"]}\n\tTo Vertex: {an_edge["To"]}"""
-                    edge_schema.append(f"""{edge}\n\t{edge_info}\n\tEdge direction: {direction}\n\tAttributes: \n\t\t{attributes}""")
-            else:
-                edge_info = f"""From Vertex: {from_vertex}\n\tTo Vertex: {to_vertex}"""
-                edge_schema.append(f"""{edge}\n\t{edge_info}\n\tEdge direction: {direction}\n\tAttributes: \n\t\t{attributes}""")
-
-        self.schema_rep = f"""The schema of the graph is as follows:
-Vertex Types:
-{chr(10).join(vertex_schema)}
-
-Edge Types:
-{chr(10).join(edge_schema)}
-"""
-        self.schema_ver = schema_ver if schema_ver is not None else -1
+        self.schema_rep, self.schema_ver = get_schema_rep(self.conn)
         return self.schema_rep
-        
+
     def generate_cypher(self, question: str, history: Iterable[str]) -> str:
         """Generate Cypher query for the question.
         Args:
@@ -106,23 +83,14 @@ Edge Types:
             str:
                 Cypher query for the question.
         """
-        PROMPT = PromptTemplate(
-            template=self.llm.generate_cypher_prompt,
-            input_variables=[
-                "question",
-                "schema",
-                "history"
-            ]
-        )
-
         schema = self._generate_schema_rep()
-    
-        logger.debug_pii("Prompt to LLM:\n" + PROMPT.invoke({"question": question, "schema": schema, "history": history}).to_string())
 
-        chain = PROMPT | self.llm.model | StrOutputParser()
+        if logger.isEnabledFor(logging.DEBUG_PII):
+            logger.debug_pii("Prompt to LLM:\n" + self.prompt.invoke({"question": question, "schema": schema, "history": history}).to_string())
+
         usage_data = {}
         with get_openai_callback() as cb:
-            out = chain.invoke({"question": question, "schema": schema, "history": history}).strip("```cypher").strip("```")
+            out = self.chain.invoke({"question": question, "schema": schema, "history": history})
 
             usage_data["input_tokens"] = cb.prompt_tokens
             usage_data["output_tokens"] = cb.completion_tokens
@@ -130,9 +98,38 @@ Edge Types:
             usage_data["cost"] = cb.total_cost
             logger.info(f"generate_cypher usage: {usage_data}")
 
-        query_header = "USE GRAPH " + self.conn.graphname + " "+ "\n" + "INTERPRET OPENCYPHER QUERY () {" + "\n"
-        query_footer = "\n}"
-        return query_header + out + query_footer
+        return self._to_query(out)
+
+    async def agenerate_cypher(self, question: str, history: Iterable[str]) -> str:
+        """Generate Cypher query for the question without blocking the event loop.
+        Args:
+            question (str):
+                question to generate the Cypher query for.
+            history (Iterable[str]):
+                conversation history for context.
+        Returns:
+            str:
+                Cypher query for the question.
+        """
+        schema = await asyncio.to_thread(self._generate_schema_rep)
+
+        if logger.isEnabledFor(logging.DEBUG_PII):
+            logger.debug_pii("Prompt to LLM:\n" + self.prompt.invoke({"question": question, "schema": schema, "history": history}).to_string())
+
+        usage_data = {}
+        with get_openai_callback() as cb:
+            out = await self.chain.ainvoke({"question": question, "schema": schema, "history": history})
+
+            usage_data["input_tokens"] = cb.prompt_tokens
+            usage_data["output_tokens"] = cb.completion_tokens
+            usage_data["total_tokens"] = cb.total_tokens
+            usage_data["cost"] = cb.total_cost
+            logger.info(f"agenerate_cypher usage: {usage_data}")
+
+        return self._to_query(out)
+
+    def _to_query(self, out: str) -> str:
+        return self.query_header + out.strip("```cypher").strip("```") + self.query_footer
     
     def _run(self, question: str, history: Iterable[str]):
         """Run the GenerateCypher tool.
@@ -145,5 +142,15 @@ Edge Types:
         """
         return self.generate_cypher(question, history)
     
-    def _arun(self, question: str, history: Iterable[str]):
-        raise NotImplementedError("Asynchronous execution is not supported for this tool.")
+    async def _arun(self, question: str, history: Iterable[str]):
+        """Run the GenerateCypher tool asynchronously.
+        Args:
+            question (str):
+                question to generate the Cypher query for.
+            history (Iterable[str]):
+                conversation history for context.
+        Returns:
+            str:
+                Cypher query for the question.
+        """
+        return await self.agenerate_cypher(question, history)
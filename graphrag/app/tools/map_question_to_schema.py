@@ -16,15 +16,21 @@ from langchain.tools import BaseTool
 from langchain.tools.base import ToolException
 from langchain.llms.base import LLM
 from langchain.prompts import PromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.output_parsers import JsonOutputParser, PydanticOutputParser
+from langchain_core.runnables import Runnable
 from langchain_community.callbacks.manager import get_openai_callback
+from cachetools import LRUCache, TTLCache
+from pydantic import ValidationError
 
 from common.metrics.tg_proxy import TigerGraphConnectionProxy
 from common.py_schemas import MapQuestionToSchemaResponse, MapAttributeToAttributeResponse
 from typing import List, Dict
-from .validation_utils import validate_schema, MapQuestionToSchemaException
+from .validation_utils import validate_schema_names, MapQuestionToSchemaException
 import re
+import orjson
+import asyncio
 import logging
+from threading import Lock
 from common.logs.log import req_id_cv
 from common.logs.logwriter import LogWriter
 from common.db.connections import get_schema_ver
@@ -32,6 +38,179 @@ from common.db.connections import get_schema_ver
 logger = logging.getLogger(__name__)
 
 
+class _JsonPydanticOutputParser(PydanticOutputParser):
+    """PydanticOutputParser that validates bare JSON output in one pydantic-core pass.
+
+    Anything else, such as JSON in a markdown fence, goes through the regular parser.
+    """
+
+    def parse_result(self, result, *, partial: bool = False):
+        if not partial:
+            text = result[0].text.strip()
+            if text.startswith("{"):
+                try:
+                    return self.pydantic_object.model_validate_json(text)
+                except ValidationError:
+                    pass
+        return super().parse_result(result, partial=partial)
+
+
+# the parsers and attribute mapping prompt don't depend on the LLM, build them once
+_RESTATE_PARSER = _JsonPydanticOutputParser(pydantic_object=MapQuestionToSchemaResponse)
+_ATTR_PARSER = _JsonPydanticOutputParser(pydantic_object=MapAttributeToAttributeResponse)
+
+_ATTR_MAP_PROMPT = PromptTemplate(
+    template="""For the following source attributes: {parsed_attrs}, map them to the corresponding output attribute in this list: {real_attrs}.
+                         Format the response way explained below:
+                        {format_instructions}""",
+    input_variables=["parsed_attrs", "real_attrs"],
+    partial_variables={"format_instructions": _ATTR_PARSER.get_format_instructions()},
+)
+
+# vertex and edge type info per (host, graph, schema version),
+# shared by every MapQuestionToSchema instance
+_schema_info_cache = LRUCache(maxsize=32)
+_schema_info_lock = Lock()
+
+
+def _resolve_attrs(attrs: list, real_attrs: list, attr_lookup: dict):
+    """Return attrs as real attribute names if each matches one up to case, else None."""
+    resolved = []
+    for attr in attrs:
+        if attr in real_attrs:
+            resolved.append(attr)
+        elif isinstance(attr, str) and attr.lower() in attr_lookup:
+            resolved.append(attr_lookup[attr.lower()])
+        else:
+            return None
+    return resolved
+
+
+def _unresolved_attrs(target_attrs: dict, attr_names: dict, attr_lookup: dict) -> dict:
+    """Fix the case of target_attrs in place and return the types still needing a mapping.
+
+    Types missing from the schema are left for validate_schema to reject.
+    """
+    unresolved = {}
+    for type_name, attrs in (target_attrs or {}).items():
+        if type_name not in attr_names:
+            continue
+        resolved = _resolve_attrs(attrs, attr_names[type_name], attr_lookup[type_name])
+        if resolved is None:
+            unresolved[type_name] = attrs
+        else:
+            target_attrs[type_name] = resolved
+    return unresolved
+
+
+def _dedupe_attr_map_inputs(requests: list) -> tuple[list, list]:
+    """Turn (parsed attrs, real attrs) requests into unique mapping inputs.
+
+    Types mapping the same attributes onto the same real attributes share a
+    call; the returned ids give the input used by each request.
+    """
+    attr_map_inputs = []
+    input_ids = []
+    seen = {}
+    for parsed_attrs, real_attrs in requests:
+        key = (frozenset(parsed_attrs), frozenset(real_attrs))
+        if key not in seen:
+            seen[key] = len(attr_map_inputs)
+            attr_map_inputs.append({"parsed_attrs": parsed_attrs, "real_attrs": real_attrs})
+        input_ids.append(seen[key])
+    return attr_map_inputs, input_ids
+
+
+def _field_complete(partial, field: str) -> bool:
+    # a field of a streamed JSON object is complete once a later field has started
+    if not isinstance(partial, dict) or field not in partial:
+        return False
+    keys = list(partial)
+    return keys.index(field) < len(keys) - 1
+
+
+# restated questions per (host, graph, schema version, model, question, conversation)
+_restate_cache = TTLCache(maxsize=1024, ttl=600)
+_restate_lock = Lock()
+
+# attribute mapping calls sent to the LLM at once for a single question
+ATTR_MAP_MAX_CONCURRENCY = 10
+
+
+def _edge_endpoint(et: dict, end: str):
+    # edges with several vertex type pairs list each distinct endpoint type
+    pairs = et.get("EdgePairs") or []
+    if et[f"{end}VertexTypeName"] == "*" or len(pairs) > 1:
+        return list(dict.fromkeys(pair[end] for pair in pairs))
+    return et[f"{end}VertexTypeName"]
+
+
+def _build_schema_info(conn: TigerGraphConnectionProxy) -> dict:
+    # one schema request instead of a request per vertex type and two per edge type
+    schema = conn.getSchema(udts=False, force=True)
+    vertices_info = [
+        {
+            "vertex": vt["Name"],
+            "attributes": [attr["AttributeName"] for attr in vt["Attributes"]],
+        }
+        for vt in schema["VertexTypes"]
+    ]
+    edges_info = [
+        {
+            "edge": et["Name"],
+            "source": _edge_endpoint(et, "From"),
+            "target": _edge_endpoint(et, "To"),
+            "attributes": [attr["AttributeName"] for attr in et["Attributes"]],
+        }
+        for et in schema["EdgeTypes"]
+    ]
+    return {
+        "vertices": [info["vertex"] for info in vertices_info],
+        "edges": [info["edge"] for info in edges_info],
+        "vertices_info": vertices_info,
+        "edges_info": edges_info,
+        # rendered once per schema version rather than by every restate prompt
+        "vertices_info_json": orjson.dumps(vertices_info).decode(),
+        "edges_info_json": orjson.dumps(edges_info).decode(),
+        "vertex_attr_names": {info["vertex"]: info["attributes"] for info in vertices_info},
+        "edge_attr_names": {info["edge"]: info["attributes"] for info in edges_info},
+        "vertex_attr_lookup": {
+            info["vertex"]: {attr.lower(): attr for attr in info["attributes"]}
+            for info in vertices_info
+        },
+        "edge_attr_lookup": {
+            info["edge"]: {attr.lower(): attr for attr in info["attributes"]}
+            for info in edges_info
+        },
+    }
+
+
+def _get_schema_info(conn: TigerGraphConnectionProxy, schema_ver: int) -> dict:
+    if schema_ver is None:
+        return _build_schema_info(conn)
+
+    key = (conn.host, conn.graphname, schema_ver)
+    with _schema_info_lock:
+        schema_info = _schema_info_cache.get(key)
+    if schema_info is not None:
+        logger.info(f"Reusing cached schema info for schema version {schema_ver}")
+    else:
+        schema_info = _build_schema_info(conn)
+        with _schema_info_lock:
+            _schema_info_cache[key] = schema_info
+    return schema_info
+
+
+def _log_usage(cb):
+    usage_data = {
+        "input_tokens": cb.prompt_tokens,
+        "output_tokens": cb.completion_tokens,
+        "total_tokens": cb.total_tokens,
+        "cost": cb.total_cost,
+    }
+    logger.info(f"map_question_to_schema usage: {usage_data}")
+
+
 class MapQuestionToSchema(BaseTool):
     """MapQuestionToSchema Tool.
     Tool to map questions to their datatypes in the database. Should be executed before GenerateFunction.
@@ -48,7 +227,15 @@ class MapQuestionToSchema(BaseTool):
     edges: list[str] = None
     vertices_info: list[dict] = None
     edges_info: list[dict] = None
-
+    vertices_info_json: str = None
+    edges_info_json: str = None
+    vertex_attr_names: dict[str, list[str]] = None
+    edge_attr_names: dict[str, list[str]] = None
+    vertex_attr_lookup: dict[str, dict[str, str]] = None
+    edge_attr_lookup: dict[str, dict[str, str]] = None
+    restate_chain: Runnable = None
+    restate_stream_chain: Runnable = None
+    attr_map_chain: Runnable = None
 
     def __init__(self, conn, llm):
         """Initialize MapQuestionToSchema.
@@ -64,24 +251,8 @@ class MapQuestionToSchema(BaseTool):
         logger.debug(f"request_id={req_id_cv.get()} MapQuestionToSchema instantiated")
         self.conn = conn
         self.llm = llm
-        self.schema_ver = -1
-        self.vertices = []
-        self.edges = []
-        self.vertices_info = []
-        self.edges_info = []
-
-
-    def _run(self, query: str, conversation: List[Dict[str, str]]) -> str:
-        """Run the tool.
-        Args:
-            query (str):
-                The user's question.
-        """
-        LogWriter.info(f"request_id={req_id_cv.get()} ENTRY MapQuestionToSchema._run()")
-        parser = PydanticOutputParser(pydantic_object=MapQuestionToSchemaResponse)
-
-        RESTATE_QUESTION_PROMPT = PromptTemplate(
-            template=self.llm.map_question_schema_prompt,
+        restate_prompt = PromptTemplate(
+            template=llm.map_question_schema_prompt,
             input_variables=[
                 "question",
                 "conversation",
@@ -90,115 +261,146 @@ class MapQuestionToSchema(BaseTool):
                 "edges",
                 "edgesInfo",
             ],
-            partial_variables={"format_instructions": parser.get_format_instructions()},
+            partial_variables={
+                "format_instructions": _RESTATE_PARSER.get_format_instructions()
+            },
         )
+        self.restate_chain = restate_prompt | llm.model | _RESTATE_PARSER
+        # yields the restated question as partial JSON while it is generated
+        self.restate_stream_chain = restate_prompt | llm.model | JsonOutputParser()
+        self.attr_map_chain = _ATTR_MAP_PROMPT | llm.model | _ATTR_PARSER
+        self.schema_ver = -1
+        self.vertices = []
+        self.edges = []
+        self.vertices_info = []
+        self.edges_info = []
+        self.vertices_info_json = "[]"
+        self.edges_info_json = "[]"
+        self.vertex_attr_names = {}
+        self.edge_attr_names = {}
+        self.vertex_attr_lookup = {}
+        self.edge_attr_lookup = {}
 
-        restate_chain = RESTATE_QUESTION_PROMPT | self.llm.model | parser
-
-        schema_ver = get_schema_ver(self.conn)
-        if schema_ver is None or self.schema_ver != schema_ver:
-            self.schema_ver = schema_ver if schema_ver is not None else -1
-            self.vertices = self.conn.getVertexTypes()
-            self.edges = self.conn.getEdgeTypes()
-
-            for vertex in self.vertices:
-                vertex_attrs = self.conn.getVertexAttrs(vertex)
-                attributes = [attr[0] for attr in vertex_attrs]
-                vertex_info = {"vertex": vertex, "attributes": attributes}
-                self.vertices_info.append(vertex_info)
-
-            for edge in self.edges:
-                source_vertex = self.conn.getEdgeSourceVertexType(edge)
-                target_vertex = self.conn.getEdgeTargetVertexType(edge)
-                edge_info = {"edge": edge, "source": source_vertex, "target": target_vertex}
-                self.edges_info.append(edge_info)
-        else:
-            logger.info(f"Reusing existing schema rep for schema version {schema_ver}")
-
-        usage_data = {}
-        with get_openai_callback() as cb:
-            parsed_q = restate_chain.invoke(
-                {
-                    "vertices": self.vertices,
-                    "verticesAttrs": self.vertices_info,
-                    "edges": self.edges,
-                    "edgesInfo": self.edges_info,
-                    "question": query,
-                    "conversation": conversation,
-                }
-            )
-            usage_data["input_tokens"] = cb.prompt_tokens
-            usage_data["output_tokens"] = cb.completion_tokens
-            usage_data["total_tokens"] = cb.total_tokens
-            usage_data["cost"] = cb.total_cost
-        # logger.info(f"parsed_q: {parsed_q}")
 
-        logger.debug_pii(
-            f"request_id={req_id_cv.get()} MapQuestionToSchema parsed for question={query} into normalized_form={parsed_q}"
+    def _attr_map_inputs(self, parsed_q: MapQuestionToSchemaResponse):
+        # the restate prompt lists every type's attributes, so only the types with
+        # attributes it did not name, even up to case, need a separate mapping call
+        vertex_attrs = _unresolved_attrs(
+            parsed_q.target_vertex_attributes, self.vertex_attr_names, self.vertex_attr_lookup
+        )
+        edge_attrs = _unresolved_attrs(
+            parsed_q.target_edge_attributes, self.edge_attr_names, self.edge_attr_lookup
         )
+        # input_ids gives the input of each vertex type, then each edge type
+        attr_map_inputs, input_ids = _dedupe_attr_map_inputs(
+            [(attrs, self.vertex_attr_names[vertex]) for vertex, attrs in vertex_attrs.items()]
+            + [(attrs, self.edge_attr_names[edge]) for edge, attrs in edge_attrs.items()]
+        )
+        return vertex_attrs, edge_attrs, attr_map_inputs, input_ids
 
-        attr_prompt = """For the following source attributes: {parsed_attrs}, map them to the corresponding output attribute in this list: {real_attrs}.
-                         Format the response way explained below:
-                        {format_instructions}"""
+    def _apply_attr_maps(self, parsed_q, vertex_attrs, edge_attrs, attr_maps, input_ids):
+        attr_maps = [attr_maps[i] for i in input_ids]
+        for vertex, res in zip(vertex_attrs, attr_maps[: len(vertex_attrs)]):
+            parsed_map = res.attr_map
+            if parsed_map:
+                parsed_q.target_vertex_attributes[vertex] = [
+                    parsed_map[x] for x in vertex_attrs[vertex] if x in parsed_map
+                ]
+        if vertex_attrs:
+            logger.debug(f"request_id={req_id_cv.get()} MapVertexAttributes applied")
 
-        attr_parser = PydanticOutputParser(
-            pydantic_object=MapAttributeToAttributeResponse
-        )
+        for edge, res in zip(edge_attrs, attr_maps[len(vertex_attrs) :]):
+            parsed_map = res.attr_map
+            if parsed_map:
+                parsed_q.target_edge_attributes[edge] = [
+                    parsed_map[x] for x in edge_attrs[edge] if x in parsed_map
+                ]
+        if edge_attrs:
+            logger.debug(f"request_id={req_id_cv.get()} MapEdgeAttributes applied")
 
-        ATTR_MAP_PROMPT = PromptTemplate(
-            template=attr_prompt,
-            input_variables=["parsed_attrs", "real_attrs"],
-            partial_variables={
-                "format_instructions": attr_parser.get_format_instructions()
-            },
+    async def _amap_attrs(self, target_attrs: dict, attr_names: dict, attr_lookup: dict):
+        """Return a copy of target_attrs with attribute case fixed and unknown attributes mapped."""
+        if target_attrs is None:
+            return None
+        target_attrs = dict(target_attrs)
+        unresolved = _unresolved_attrs(target_attrs, attr_names, attr_lookup)
+        attr_map_inputs, input_ids = _dedupe_attr_map_inputs(
+            [(attrs, attr_names[type_name]) for type_name, attrs in unresolved.items()]
         )
-
-        attr_map_chain = ATTR_MAP_PROMPT | self.llm.model | attr_parser
-        if parsed_q.target_vertex_attributes:
-            for vertex in parsed_q.target_vertex_attributes.keys():
-                with get_openai_callback() as cb:
-                    parsed_map = attr_map_chain.invoke(
-                        {
-                            "parsed_attrs": parsed_q.target_vertex_attributes[vertex],
-                            "real_attrs": [attr[0] for attr in self.conn.getVertexAttrs(vertex)],
-                        }
-                    ).attr_map
-                    usage_data["input_tokens"] += cb.prompt_tokens
-                    usage_data["output_tokens"] += cb.completion_tokens
-                    usage_data["total_tokens"] += cb.total_tokens
-                    usage_data["cost"] += cb.total_cost
+        if attr_map_inputs:
+            attr_maps = await self.attr_map_chain.abatch(
+                attr_map_inputs,
+                config={"max_concurrency": ATTR_MAP_MAX_CONCURRENCY},
+            )
+            for (type_name, attrs), i in zip(unresolved.items(), input_ids):
+                parsed_map = attr_maps[i].attr_map
                 if parsed_map:
-                    parsed_q.target_vertex_attributes[vertex] = [
-                        parsed_map.get(x) for x in list(parsed_q.target_vertex_attributes[vertex])
-                    ]
+                    target_attrs[type_name] = [parsed_map[x] for x in attrs if x in parsed_map]
+        return target_attrs
 
-            logger.debug(f"request_id={req_id_cv.get()} MapVertexAttributes applied")
+    def _refresh_schema_info(self) -> int:
+        schema_ver = get_schema_ver(self.conn)
+        if schema_ver is None or self.schema_ver != schema_ver:
+            self.schema_ver = schema_ver if schema_ver is not None else -1
+            schema_info = _get_schema_info(self.conn, schema_ver)
+            self.vertices = schema_info["vertices"]
+            self.edges = schema_info["edges"]
+            self.vertices_info = schema_info["vertices_info"]
+            self.edges_info = schema_info["edges_info"]
+            self.vertices_info_json = schema_info["vertices_info_json"]
+            self.edges_info_json = schema_info["edges_info_json"]
+            self.vertex_attr_names = schema_info["vertex_attr_names"]
+            self.edge_attr_names = schema_info["edge_attr_names"]
+            self.vertex_attr_lookup = schema_info["vertex_attr_lookup"]
+            self.edge_attr_lookup = schema_info["edge_attr_lookup"]
+        else:
+            logger.info(f"Reusing existing schema rep for schema version {schema_ver}")
+        return schema_ver
 
-        if parsed_q.target_edge_attributes:
-            for edge in parsed_q.target_edge_attributes.keys():
-                with get_openai_callback() as cb:
-                    parsed_map = attr_map_chain.invoke(
-                        {
-                            "parsed_attrs": parsed_q.target_edge_attributes[edge],
-                            "real_attrs": self.conn.getEdgeAttrs(edge),
-                        }
-                    ).attr_map
-                    usage_data["input_tokens"] += cb.prompt_tokens
-                    usage_data["output_tokens"] += cb.completion_tokens
-                    usage_data["total_tokens"] += cb.total_tokens
-                    usage_data["cost"] += cb.total_cost
-                if parsed_map:
-                    parsed_q.target_edge_attributes[edge] = [
-                        parsed_map[x] for x in list(parsed_q.target_edge_attributes[edge])
-                    ]
+    def _cached_restate(self, query: str, conversation, schema_ver: int):
+        """Return the restate cache key and the cached restated question, if any."""
+        if schema_ver is None:
+            return None, None
+        restate_key = (
+            self.conn.host,
+            self.conn.graphname,
+            schema_ver,
+            self.llm.model_name,
+            " ".join(query.split()),
+            orjson.dumps(conversation, option=orjson.OPT_SORT_KEYS, default=str),
+        )
+        with _restate_lock:
+            cached = _restate_cache.get(restate_key)
+        if cached is None:
+            return restate_key, None
+        logger.info(f"request_id={req_id_cv.get()} Reusing cached restated question")
+        # the attribute mapping edits the result, so work on a copy
+        return restate_key, cached.model_copy(deep=True)
 
-            logger.debug(f"request_id={req_id_cv.get()} MapEdgeAttributes applied")
+    def _restate_inputs(self, query: str, conversation) -> dict:
+        return {
+            "vertices": self.vertices,
+            "verticesAttrs": self.vertices_info_json,
+            "edges": self.edges,
+            "edgesInfo": self.edges_info_json,
+            "question": query,
+            "conversation": conversation,
+        }
 
-        logger.info(f"map_question_to_schema usage: {usage_data}")
+    def _restated(self, query: str, restate_key, parsed_q: MapQuestionToSchemaResponse):
+        if restate_key is not None:
+            with _restate_lock:
+                _restate_cache[restate_key] = parsed_q.model_copy(deep=True)
+        logger.debug_pii(
+            f"request_id={req_id_cv.get()} MapQuestionToSchema parsed for question={query} into normalized_form={parsed_q}"
+        )
 
+    def _validate(self, parsed_q: MapQuestionToSchemaResponse):
         try:
-            validate_schema(
-                self.conn,
+            # checked against the cached schema info, without a call to the database
+            validate_schema_names(
+                self.vertex_attr_names,
+                self.edge_attr_names,
                 parsed_q.target_vertex_types,
                 parsed_q.target_edge_types,
                 parsed_q.target_vertex_attributes,
@@ -209,13 +411,103 @@ class MapQuestionToSchema(BaseTool):
                 f"request_id={req_id_cv.get()} WARN MapQuestionToSchema to validate schema"
             )
             raise e
+
+    def _run(self, query: str, conversation: List[Dict[str, str]]) -> str:
+        """Run the tool.
+        Args:
+            query (str):
+                The user's question.
+        """
+        LogWriter.info(f"request_id={req_id_cv.get()} ENTRY MapQuestionToSchema._run()")
+        schema_ver = self._refresh_schema_info()
+        restate_key, parsed_q = self._cached_restate(query, conversation, schema_ver)
+
+        # one callback collects the token usage of every LLM call of the question
+        with get_openai_callback() as cb:
+            if parsed_q is None:
+                parsed_q = self.restate_chain.invoke(self._restate_inputs(query, conversation))
+                self._restated(query, restate_key, parsed_q)
+
+            vertex_attrs, edge_attrs, attr_map_inputs, input_ids = self._attr_map_inputs(
+                parsed_q
+            )
+            if attr_map_inputs:
+                # the mappings are independent, so send them to the LLM concurrently
+                attr_maps = self.attr_map_chain.batch(
+                    attr_map_inputs,
+                    config={"max_concurrency": ATTR_MAP_MAX_CONCURRENCY},
+                )
+                self._apply_attr_maps(
+                    parsed_q, vertex_attrs, edge_attrs, attr_maps, input_ids
+                )
+
+        _log_usage(cb)
+        self._validate(parsed_q)
         LogWriter.info(f"request_id={req_id_cv.get()} EXIT MapQuestionToSchema._run()")
-        # logger.info(f"parsed_q: {parsed_q}")
         return parsed_q
 
-    async def _arun(self) -> str:
-        """Use the tool asynchronously."""
-        raise NotImplementedError("custom_search does not support async")
+    async def _arun(self, query: str, conversation: List[Dict[str, str]]) -> str:
+        """Run the tool asynchronously.
+        Args:
+            query (str):
+                The user's question.
+            conversation (List[Dict[str, str]]):
+                conversation history for context.
+        """
+        LogWriter.info(f"request_id={req_id_cv.get()} ENTRY MapQuestionToSchema._arun()")
+        # the schema version check and refresh are blocking database calls
+        schema_ver = await asyncio.to_thread(self._refresh_schema_info)
+        restate_key, parsed_q = self._cached_restate(query, conversation, schema_ver)
+
+        with get_openai_callback() as cb:
+            vertex_task = None
+            if parsed_q is None:
+                # stream the restated question and start mapping the vertex attributes
+                # as soon as they are complete, while the edge fields are generated
+                restated = None
+                try:
+                    async for restated in self.restate_stream_chain.astream(
+                        self._restate_inputs(query, conversation)
+                    ):
+                        if vertex_task is None and _field_complete(
+                            restated, "target_vertex_attributes"
+                        ):
+                            vertex_task = asyncio.create_task(
+                                self._amap_attrs(
+                                    restated["target_vertex_attributes"],
+                                    self.vertex_attr_names,
+                                    self.vertex_attr_lookup,
+                                )
+                            )
+                    parsed_q = MapQuestionToSchemaResponse.model_validate(restated)
+                except BaseException:
+                    if vertex_task is not None:
+                        vertex_task.cancel()
+                    raise
+                self._restated(query, restate_key, parsed_q)
+
+            if vertex_task is None:
+                vertex_task = self._amap_attrs(
+                    parsed_q.target_vertex_attributes,
+                    self.vertex_attr_names,
+                    self.vertex_attr_lookup,
+                )
+            (
+                parsed_q.target_vertex_attributes,
+                parsed_q.target_edge_attributes,
+            ) = await asyncio.gather(
+                vertex_task,
+                self._amap_attrs(
+                    parsed_q.target_edge_attributes,
+                    self.edge_attr_names,
+                    self.edge_attr_lookup,
+                ),
+            )
+
+        _log_usage(cb)
+        self._validate(parsed_q)
+        LogWriter.info(f"request_id={req_id_cv.get()} EXIT MapQuestionToSchema._arun()")
+        return parsed_q
 
     # def _handle_error(self, error:MapQuestionToSchemaException) -> str:
     #    return  "The following errors occurred during tool execution:" + error.args[0]+ "Please make sure to map the question to the schema"
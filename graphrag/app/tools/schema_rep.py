@@ -0,0 +1,145 @@
+# Copyright (c) 2025 TigerGraph, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import logging
+import threading
+import time
+from threading import Lock
+
+from cachetools import LRUCache
+from common.metrics.tg_proxy import TigerGraphConnectionProxy
+from common.db.connections import get_schema_ver
+
+logger = logging.getLogger(__name__)
+
+# schema reps per (host, graph, schema version), shared by the query generation tools
+_schema_rep_cache = LRUCache(maxsize=32)
+# latest (schema rep, schema version, check time) per (host, graph)
+_latest_schema_rep = LRUCache(maxsize=32)
+_refreshing = set()
+_schema_rep_lock = Lock()
+
+# seconds a schema version is trusted before it is checked again
+SCHEMA_VER_CHECK_INTERVAL = 30
+
+
+_SCHEMA_REP_HEADER = """The schema of the graph is as follows.
+Vertex types are listed as V Name(primary_id:TYPE, attribute:TYPE, ...), the first attribute being the primary id.
+Edge types are listed as E name: From->To [attribute:TYPE, ...], with From--To for undirected edges.
+"""
+
+
+def _format_attributes(attrs) -> str:
+    return ", ".join(
+        f'{attr["AttributeName"]}:{attr["AttributeType"]["Name"]}' for attr in attrs
+    )
+
+
+def build_schema_rep(conn: TigerGraphConnectionProxy) -> str:
+    """Describe the vertex and edge types of the connection's graph for an LLM prompt.
+
+    Each type takes a single line, which keeps the prompt short for large schemas.
+    """
+    # one fresh schema fetch, rather than a lookup per type in the client's cached
+    # copy; the rep has no use for UDTs, so skip their extra request
+    schema = conn.getSchema(udts=False, force=True)
+    buf = io.StringIO()
+    buf.write(_SCHEMA_REP_HEADER)
+    for vt in schema["VertexTypes"]:
+        primary_id = vt["PrimaryId"]
+        primary_name = primary_id["AttributeName"]
+        buf.write(f'V {vt["Name"]}({primary_name}:{primary_id["AttributeType"]["Name"]}')
+        attributes = _format_attributes(
+            attr for attr in vt["Attributes"] if attr["AttributeName"] != primary_name
+        )
+        buf.write(f", {attributes})\n" if attributes else ")\n")
+
+    for et in schema["EdgeTypes"]:
+        #reverse_edge = et["Config"].get("REVERSE_EDGE")
+        arrow = "->" if et["IsDirected"] else "--"
+        if et["FromVertexTypeName"] == "*" or et["ToVertexTypeName"] == "*":
+            pairs = " | ".join(f'{p["From"]}{arrow}{p["To"]}' for p in et["EdgePairs"])
+        else:
+            pairs = f'{et["FromVertexTypeName"]}{arrow}{et["ToVertexTypeName"]}'
+        attributes = _format_attributes(et["Attributes"])
+        buf.write(f'E {et["Name"]}: {pairs}')
+        buf.write(f" [{attributes}]\n" if attributes else "\n")
+
+    return buf.getvalue()
+
+
+def _load_schema_rep(conn: TigerGraphConnectionProxy) -> tuple[str, int]:
+    schema_ver = get_schema_ver(conn)
+    if schema_ver is None:
+        return build_schema_rep(conn), None
+
+    key = (conn.host, conn.graphname, schema_ver)
+    with _schema_rep_lock:
+        schema_rep = _schema_rep_cache.get(key)
+    if schema_rep is not None:
+        logger.info(f"Reusing existing schema rep for schema version {schema_ver}")
+    else:
+        schema_rep = build_schema_rep(conn)
+    with _schema_rep_lock:
+        _schema_rep_cache[key] = schema_rep
+        _latest_schema_rep[(conn.host, conn.graphname)] = (
+            schema_rep,
+            schema_ver,
+            time.monotonic(),
+        )
+    return schema_rep, schema_ver
+
+
+def _refresh_schema_rep(conn: TigerGraphConnectionProxy, graph_key: tuple):
+    try:
+        _load_schema_rep(conn)
+    except Exception as e:
+        logger.warning(f"Failed to refresh the schema rep of {graph_key}: {e}")
+    finally:
+        with _schema_rep_lock:
+            _refreshing.discard(graph_key)
+
+
+def get_schema_rep(conn: TigerGraphConnectionProxy) -> tuple[str, int]:
+    """Return the schema rep and schema version of the connection's graph.
+
+    The schema version is checked at most every SCHEMA_VER_CHECK_INTERVAL
+    seconds. Past that, the last rep is still returned right away while a
+    background thread checks the version and rebuilds the rep if it changed.
+    """
+    graph_key = (conn.host, conn.graphname)
+    with _schema_rep_lock:
+        latest = _latest_schema_rep.get(graph_key)
+        if latest is not None:
+            schema_rep, schema_ver, checked_at = latest
+            if (
+                time.monotonic() - checked_at >= SCHEMA_VER_CHECK_INTERVAL
+                and graph_key not in _refreshing
+            ):
+                _refreshing.add(graph_key)
+                threading.Thread(
+                    target=_refresh_schema_rep, args=(conn, graph_key), daemon=True
+                ).start()
+            return schema_rep, schema_ver
+    return _load_schema_rep(conn)
+
+
+def invalidate_schema_rep(conn: TigerGraphConnectionProxy = None):
+    """Forget the latest schema rep of a connection's graph, or of all graphs."""
+    with _schema_rep_lock:
+        if conn is None:
+            _latest_schema_rep.clear()
+        else:
+            _latest_schema_rep.pop((conn.host, conn.graphname), None)
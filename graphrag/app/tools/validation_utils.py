@@ -24,52 +24,71 @@ class InvalidFunctionCallException(Exception):
 
 
 def validate_schema(conn, v_types, e_types, v_attrs, e_attrs):
-    LogWriter.info(f"request_id={req_id_cv.get()} ENTRY validate_schema()")
+    vertex_attr_names = {}
     if v_types:
         vertices = conn.getVertexTypes()
-        for v in v_types:
-            logger.debug(
-                f"request_id={req_id_cv.get()} validate_schema() validating vertex_type={v}"
-            )
-            if v in vertices:
-                if v_attrs:
-                    attrs = [x["AttributeName"] for x in conn.getVertexType(v)["Attributes"]]
-                    for attr in v_attrs.get(v, []):
-                        if attr not in attrs and attr != "":
-                            if attr is None:
-                                attr = "None"
-                            raise MapQuestionToSchemaException(
-                                f"{attr} is not found for {v} in the data schema. Run MapQuestionToSchema to validate schema."
-                            )
-            else:
-                if v is None:
-                    v = "None"
-                raise MapQuestionToSchemaException(
-                    f"{v} is not found in the data schema. Run MapQuestionToSchema to validate schema."
-                )
-
+        vertex_attr_names = {
+            v: [x["AttributeName"] for x in conn.getVertexType(v)["Attributes"]] if v_attrs else []
+            for v in v_types
+            if v in vertices
+        }
+    edge_attr_names = {}
     if e_types:
         edges = conn.getEdgeTypes()
-        for e in e_types:
-            logger.debug(
-                f"request_id={req_id_cv.get()} validate_schema() validating edge_type={e}"
+        edge_attr_names = {
+            e: [x["AttributeName"] for x in conn.getEdgeType(e)["Attributes"]] if e_attrs else []
+            for e in e_types
+            if e in edges
+        }
+    return validate_schema_names(
+        vertex_attr_names, edge_attr_names, v_types, e_types, v_attrs, e_attrs
+    )
+
+
+def validate_schema_names(vertex_attr_names, edge_attr_names, v_types, e_types, v_attrs, e_attrs):
+    """Validate against {type: attribute names} dicts of the schema instead of the database."""
+    LogWriter.info(f"request_id={req_id_cv.get()} ENTRY validate_schema()")
+    for v in v_types or []:
+        logger.debug(
+            f"request_id={req_id_cv.get()} validate_schema() validating vertex_type={v}"
+        )
+        if v in vertex_attr_names:
+            if v_attrs:
+                attrs = vertex_attr_names[v]
+                for attr in v_attrs.get(v, []):
+                    if attr not in attrs and attr != "":
+                        if attr is None:
+                            attr = "None"
+                        raise MapQuestionToSchemaException(
+                            f"{attr} is not found for {v} in the data schema. Run MapQuestionToSchema to validate schema."
+                        )
+        else:
+            if v is None:
+                v = "None"
+            raise MapQuestionToSchemaException(
+                f"{v} is not found in the data schema. Run MapQuestionToSchema to validate schema."
+            )
+
+    for e in e_types or []:
+        logger.debug(
+            f"request_id={req_id_cv.get()} validate_schema() validating edge_type={e}"
+        )
+        if e in edge_attr_names:
+            if e_attrs:
+                attrs = edge_attr_names[e]
+                for attr in e_attrs.get(e, []):
+                    if attr not in attrs and attr != "":
+                        if attr is None:
+                            attr = "None"
+                        raise MapQuestionToSchemaException(
+                            f"{attr} is not found for {e} in the data schema. Run MapQuestionToSchema to validate schema."
+                        )
+        else:
+            if e is None:
+                e = "None"
+            raise MapQuestionToSchemaException(
+                f"{e} is not found in the data schema. Run MapQuestionToSchema to validate schema."
             )
-            if e in edges:
-                if e_attrs:
-                    attrs = [x["AttributeName"] for x in conn.getEdgeType(e)["Attributes"]]
-                    for attr in e_attrs.get(e, []):
-                        if attr not in attrs and attr != "":
-                            if attr is None:
-                                attr = "None"
-                            raise MapQuestionToSchemaException(
-                                f"{attr} is not found for {e} in the data schema. Run MapQuestionToSchema to validate schema."
-                            )
-            else:
-                if e is None:
-                    e = "None"
-                raise MapQuestionToSchemaException(
-                    f"{e} is not found in the data schema. Run MapQuestionToSchema to validate schema."
-                )
     LogWriter.info(f"request_id={req_id_cv.get()} EXIT validate_schema()")
     return True
 
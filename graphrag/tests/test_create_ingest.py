@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import MagicMock
+from common.py_schemas.schemas import CreateIngestConfig
+from app.supportai.supportai import _fill_template, create_ingest
+
+
+class TestFillTemplate(unittest.TestCase):
+    def test_single_pass(self):
+        """Test that substituted text is not substituted again."""
+        self.assertEqual(
+            _fill_template('"a" "b"', {'"a"': '"b"', '"b"': '"c"'}),
+            '"b" "c"',
+        )
+
+    def test_every_occurrence(self):
+        self.assertEqual(_fill_template("@x@-@x@", {"@x@": "y"}), "y-y")
+
+
+class TestCreateIngest(unittest.TestCase):
+    def setUp(self):
+        self.conn = MagicMock()
+        self.conn.gsql.return_value = (
+            "Successfully created loading jobs: [load_documents_content_1a2b]."
+        )
+
+    def create(self, file_format, loader_config):
+        res = create_ingest(
+            "SupportAI",
+            CreateIngestConfig(
+                data_source="local",
+                data_source_config={"data_path": "/data/docs"},
+                loader_config=loader_config,
+                file_format=file_format,
+            ),
+            self.conn,
+        )
+        self.assertEqual(res["load_job_id"], "load_documents_content_1a2b")
+        self.assertEqual(res["data_source_id"], "DocumentContent")
+        self.conn.gsql.assert_called_once()
+        return self.conn.gsql.call_args[0][0]
+
+    def test_json(self):
+        """Test that the JSON job uses the configured fields."""
+        job = self.create(
+            "json",
+            {"doc_id_field": "url", "content_field": "text", "doc_type": "web"},
+        )
+        self.assertIn('gsql_lower($"url")', job)
+        self.assertIn('"web", $"text"', job)
+        self.assertNotIn('"doc_id"', job)
+        self.assertNotIn("@uuid@", job)
+
+    def test_json_defaults(self):
+        job = self.create("json", {})
+        self.assertIn('gsql_lower($"doc_id")', job)
+        self.assertIn('"", $"content"', job)
+
+    def test_csv(self):
+        """Test that the CSV job uses the configured loader options."""
+        job = self.create(
+            "csv",
+            {"separator": ",", "header": "false", "eol": "\\r\\n", "quote": "single"},
+        )
+        self.assertIn(
+            'USING SEPARATOR=",", HEADER="false", EOL="\\r\\n", QUOTE="single"', job
+        )
+        self.assertNotIn('SEPARATOR="|"', job)
+        self.assertNotIn("@uuid@", job)
+
+    def test_csv_defaults(self):
+        """Test that the CSV defaults leave the template options as they are."""
+        job = self.create("csv", {})
+        self.assertIn(
+            'USING SEPARATOR="|", HEADER="true", EOL="\\n", QUOTE="double"', job
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
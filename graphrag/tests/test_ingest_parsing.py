@@ -0,0 +1,58 @@
+import unittest
+from app.supportai.supportai import _parse_created_id
+from app.routers.supportai import _parse_loading_job_output
+
+
+class TestParseCreatedId(unittest.TestCase):
+    def test_loading_job(self):
+        """Test parsing the name of a created loading job."""
+        output = (
+            "Using graph 'SupportAI'\n"
+            "Successfully created loading jobs: [load_documents_content_json_1a2b]."
+        )
+        self.assertEqual(_parse_created_id(output), "load_documents_content_json_1a2b")
+
+    def test_data_source(self):
+        """Test parsing the name of a created data source."""
+        output = (
+            "Using graph 'SupportAI'\n"
+            "Successfully created data sources: [SupportAI_SupportAI_3c4d]."
+        )
+        self.assertEqual(_parse_created_id(output), "SupportAI_SupportAI_3c4d")
+
+    def test_no_id(self):
+        """Test that output without a created id raises."""
+        with self.assertRaises(Exception):
+            _parse_created_id("Using graph 'SupportAI'\nFailed to create loading jobs")
+
+
+class TestParseLoadingJobOutput(unittest.TestCase):
+    def test_noprint_output(self):
+        """Test parsing the job id and log directory of a -noprint loading job."""
+        output = (
+            "Using graph 'SupportAI'\n"
+            "Running the following loading job in background with '-noprint' option:\n"
+            "  Job name: load_documents_content_json_1a2b\n"
+            "  Jobid: SupportAI.load_documents_content_json_1a2b.s3.m1.1717000000000\n"
+            "  Log directory: /home/tigergraph/log/fileLoader/SupportAI.load_documents_content_json_1a2b.s3.m1.1717000000000\n"
+            "Job \"SupportAI.load_documents_content_json_1a2b.s3.m1.1717000000000\" loading status"
+        )
+        job_id, log_location = _parse_loading_job_output(output)
+        self.assertEqual(
+            job_id, "SupportAI.load_documents_content_json_1a2b.s3.m1.1717000000000"
+        )
+        self.assertEqual(
+            log_location,
+            "/home/tigergraph/log/fileLoader/SupportAI.load_documents_content_json_1a2b.s3.m1.1717000000000",
+        )
+
+    def test_without_noprint_marker(self):
+        """Test that output of a job that did not start raises."""
+        with self.assertRaises(Exception):
+            _parse_loading_job_output(
+                "Jobid: SupportAI.job.m1.1\nLog directory: /tmp/log\nLOAD FAILED"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from app.tools.map_question_to_schema import (
+    _resolve_attrs,
+    _unresolved_attrs,
+    _dedupe_attr_map_inputs,
+    _field_complete,
+)
+
+
+class TestResolveAttrs(unittest.TestCase):
+    def setUp(self):
+        self.real_attrs = ["firstName", "age"]
+        self.attr_lookup = {"firstname": "firstName", "age": "age"}
+
+    def test_exact_names(self):
+        self.assertEqual(
+            _resolve_attrs(["firstName", "age"], self.real_attrs, self.attr_lookup),
+            ["firstName", "age"],
+        )
+
+    def test_case_insensitive(self):
+        """Test that names differing only in case resolve to the real name."""
+        self.assertEqual(
+            _resolve_attrs(["FIRSTNAME", "Age"], self.real_attrs, self.attr_lookup),
+            ["firstName", "age"],
+        )
+
+    def test_unknown_attr(self):
+        """Test that one unknown name leaves the whole list unresolved."""
+        self.assertIsNone(
+            _resolve_attrs(["firstName", "first_name"], self.real_attrs, self.attr_lookup)
+        )
+
+    def test_non_string_attr(self):
+        self.assertIsNone(_resolve_attrs([None], self.real_attrs, self.attr_lookup))
+
+    def test_unresolved_attrs(self):
+        """Test that resolved types are fixed in place and others returned."""
+        target_attrs = {
+            "Person": ["FIRSTNAME"],
+            "City": ["population"],
+            "Country": ["name"],
+        }
+        attr_names = {"Person": self.real_attrs, "City": ["name"]}
+        attr_lookup = {"Person": self.attr_lookup, "City": {"name": "name"}}
+        unresolved = _unresolved_attrs(target_attrs, attr_names, attr_lookup)
+        self.assertEqual(unresolved, {"City": ["population"]})
+        self.assertEqual(target_attrs["Person"], ["firstName"])
+        self.assertEqual(target_attrs["Country"], ["name"])
+
+
+class TestDedupeAttrMapInputs(unittest.TestCase):
+    def test_same_inputs_share_a_call(self):
+        """Test that requests with the same attributes in any order share an input."""
+        inputs, ids = _dedupe_attr_map_inputs(
+            [
+                (["name", "age"], ["firstName", "age"]),
+                (["since"], ["since", "until"]),
+                (["age", "name"], ["age", "firstName"]),
+            ]
+        )
+        self.assertEqual(
+            inputs,
+            [
+                {"parsed_attrs": ["name", "age"], "real_attrs": ["firstName", "age"]},
+                {"parsed_attrs": ["since"], "real_attrs": ["since", "until"]},
+            ],
+        )
+        self.assertEqual(ids, [0, 1, 0])
+
+    def test_no_requests(self):
+        self.assertEqual(_dedupe_attr_map_inputs([]), ([], []))
+
+
+class TestFieldComplete(unittest.TestCase):
+    def test_later_field_started(self):
+        """Test that a field is complete once a later field has started."""
+        partial = {"question": "How many people?", "target_vertex_types": ["Pe"]}
+        self.assertTrue(_field_complete(partial, "question"))
+        self.assertFalse(_field_complete(partial, "target_vertex_types"))
+
+    def test_missing_field(self):
+        self.assertFalse(_field_complete({"question": "How"}, "target_vertex_types"))
+
+    def test_not_a_dict(self):
+        self.assertFalse(_field_complete(None, "question"))
+
+
+if __name__ == "__main__":
+    unittest.main()
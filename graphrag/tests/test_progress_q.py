@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import patch
+from app.agent.Q import DONE, MERGE_WINDOW, Q
+
+
+class TestQ(unittest.TestCase):
+    def put_at(self, q, item, t):
+        with patch("app.agent.Q.time.monotonic", return_value=t):
+            q.put(item)
+
+    def test_fifo(self):
+        """Test that messages are popped in the order they were put."""
+        q = Q()
+        for item in ["a", "b", DONE]:
+            q.put(item)
+        self.assertEqual([q.pop(), q.pop(), q.pop()], ["a", "b", DONE])
+        self.assertIsNone(q.pop())
+
+    def test_merges_repeat_within_window(self):
+        """Test that a progress message repeated within the window is merged."""
+        q = Q()
+        self.put_at(q, "a", 0)
+        self.put_at(q, "a", MERGE_WINDOW / 2)
+        self.put_at(q, "b", MERGE_WINDOW / 2)
+        self.put_at(q, "a", MERGE_WINDOW / 2)
+        self.assertEqual([q.pop(), q.pop(), q.pop()], ["a", "b", "a"])
+        self.assertIsNone(q.pop())
+
+    def test_keeps_repeat_after_window(self):
+        """Test that a repeat arriving after the window is kept."""
+        q = Q()
+        self.put_at(q, "a", 0)
+        self.put_at(q, "a", MERGE_WINDOW * 2)
+        self.assertEqual([q.pop(), q.pop()], ["a", "a"])
+
+    def test_never_merges_done(self):
+        """Test that a repeated DONE is never dropped."""
+        q = Q()
+        self.put_at(q, DONE, 0)
+        self.put_at(q, DONE, 0)
+        self.assertEqual([q.pop(), q.pop()], [DONE, DONE])
+
+    def test_repeat_after_read(self):
+        """Test that a message is queued again once the previous one was read."""
+        q = Q()
+        self.put_at(q, "a", 0)
+        self.assertEqual(q.pop(), "a")
+        self.put_at(q, "a", 0)
+        self.assertEqual(q.pop(), "a")
+
+    def test_clear(self):
+        q = Q()
+        q.put("a")
+        q.clear()
+        self.assertIsNone(q.pop())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from app.agent.agent_router import RouterCache
+
+
+class TestRouterCacheTemplate(unittest.TestCase):
+    def setUp(self):
+        self.cache = RouterCache()
+        self.schema_names = {"document", "person", "address", "company", "knows"}
+
+    def test_schema_names_ignore_case_and_plural(self):
+        """Test that a type name gives the same template in any case and number."""
+        expected = "how many document are there ?"
+        for question in [
+            "How many Documents are there?",
+            "How many documents are there?",
+            "How many Document are there?",
+        ]:
+            self.assertEqual(self.cache.template(question, self.schema_names), expected)
+
+    def test_plural_es(self):
+        """Test that -es plurals map to the type name."""
+        self.assertEqual(
+            self.cache.template("List all Addresses", self.schema_names),
+            "list all address",
+        )
+
+    def test_plural_ies(self):
+        """Test that -ies plurals map to the -y type name."""
+        expected = "how many company are there ?"
+        for question in ["How many Companies are there?", "How many company are there?"]:
+            self.assertEqual(self.cache.template(question, self.schema_names), expected)
+
+    def test_entities_share_a_template(self):
+        """Test that questions differing only in entities share a template."""
+        a = self.cache.template("Who does Alice know?", self.schema_names)
+        b = self.cache.template("Who does Bob Smith know?", self.schema_names)
+        self.assertEqual(a, "who does <ENT> know ?")
+        self.assertEqual(a, b)
+
+    def test_quoted_strings_and_numbers(self):
+        """Test that quoted strings and tokens with digits become placeholders."""
+        self.assertEqual(
+            self.cache.template('Find person "jdoe" with id 42', self.schema_names),
+            "find person <ENT> with id <ENT>",
+        )
+
+    def test_joined_words_are_one_token(self):
+        """Test that words joined by a slash are a single entity."""
+        self.assertEqual(
+            self.cache.template("Find documents about I/O", self.schema_names),
+            "find document about <ENT>",
+        )
+
+    def test_first_word_is_not_an_entity(self):
+        """Test that the capitalized first word of a question is kept."""
+        self.assertEqual(
+            self.cache.template("Show the documents", self.schema_names),
+            "show the document",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
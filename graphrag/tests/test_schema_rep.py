@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import MagicMock
+from app.tools.schema_rep import build_schema_rep
+
+
+def _attr(name, type_name):
+    return {"AttributeName": name, "AttributeType": {"Name": type_name}}
+
+
+SCHEMA = {
+    "VertexTypes": [
+        {
+            "Name": "Person",
+            "PrimaryId": _attr("id", "STRING"),
+            "Attributes": [_attr("name", "STRING"), _attr("age", "INT")],
+        },
+        {
+            "Name": "City",
+            "PrimaryId": _attr("name", "STRING"),
+            # primary id stored as an attribute is listed once
+            "Attributes": [_attr("name", "STRING")],
+        },
+    ],
+    "EdgeTypes": [
+        {
+            "Name": "lives_in",
+            "IsDirected": True,
+            "FromVertexTypeName": "Person",
+            "ToVertexTypeName": "City",
+            "Attributes": [_attr("since", "DATETIME")],
+        },
+        {
+            "Name": "knows",
+            "IsDirected": False,
+            "FromVertexTypeName": "Person",
+            "ToVertexTypeName": "Person",
+            "Attributes": [],
+        },
+        {
+            "Name": "visited",
+            "IsDirected": True,
+            "FromVertexTypeName": "*",
+            "ToVertexTypeName": "*",
+            "EdgePairs": [
+                {"From": "Person", "To": "City"},
+                {"From": "City", "To": "City"},
+            ],
+            "Attributes": [],
+        },
+    ],
+}
+
+
+class TestBuildSchemaRep(unittest.TestCase):
+    def setUp(self):
+        self.conn = MagicMock()
+        self.conn.getSchema.return_value = SCHEMA
+
+    def test_schema_rep(self):
+        """Test that every vertex and edge type takes a single line."""
+        lines = build_schema_rep(self.conn).splitlines()
+        self.assertEqual(
+            lines[-5:],
+            [
+                "V Person(id:STRING, name:STRING, age:INT)",
+                "V City(name:STRING)",
+                "E lives_in: Person->City [since:DATETIME]",
+                "E knows: Person--Person",
+                "E visited: Person->City | City->City",
+            ],
+        )
+
+    def test_fetches_schema_once(self):
+        """Test that the schema is fetched once, without UDTs."""
+        build_schema_rep(self.conn)
+        self.conn.getSchema.assert_called_once_with(udts=False, force=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
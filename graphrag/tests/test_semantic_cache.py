@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch
+from app.supportai.retrievers._cache import LLMSemanticCache
+
+
+class TestLLMSemanticCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = LLMSemanticCache(similarity_threshold=0.97)
+        self.key = LLMSemanticCache.cache_key("host", "graph", "index", 5)
+
+    def test_get_similar_question(self):
+        """Test that a cached answer is returned for a similar question."""
+        self.cache.set(self.key, [1.0, 0.0, 0.0], {"answer": "a"})
+        self.assertEqual(self.cache.get(self.key, [1.0, 0.01, 0.0]), {"answer": "a"})
+
+    def test_get_below_threshold(self):
+        """Test that a question below the similarity threshold misses."""
+        self.cache.set(self.key, [1.0, 0.0, 0.0], {"answer": "a"})
+        self.assertIsNone(self.cache.get(self.key, [1.0, 1.0, 0.0]))
+
+    def test_get_returns_best_match(self):
+        """Test that the most similar cached question wins."""
+        self.cache.set(self.key, [1.0, 0.0, 0.0], "x")
+        self.cache.set(self.key, [0.0, 1.0, 0.0], "y")
+        self.assertEqual(self.cache.get(self.key, [0.01, 1.0, 0.0]), "y")
+
+    def test_get_returns_a_copy(self):
+        """Test that changing a returned answer leaves the cached one alone."""
+        self.cache.set(self.key, [1.0, 0.0], {"answer": "a"})
+        self.cache.get(self.key, [1.0, 0.0])["answer"] = "b"
+        self.assertEqual(self.cache.get(self.key, [1.0, 0.0]), {"answer": "a"})
+
+    def test_keys_are_separate(self):
+        """Test that other retrieval parameters don't share answers."""
+        self.cache.set(self.key, [1.0, 0.0], "a")
+        other = LLMSemanticCache.cache_key("host", "graph", "index", 10)
+        self.assertNotEqual(self.key, other)
+        self.assertIsNone(self.cache.get(other, [1.0, 0.0]))
+
+    def test_expired_entries(self):
+        """Test that entries older than the ttl are not returned."""
+        with patch("app.supportai.retrievers._cache.time.time", return_value=0):
+            self.cache.set(self.key, [1.0, 0.0], "a")
+        with patch(
+            "app.supportai.retrievers._cache.time.time",
+            return_value=self.cache.ttl + 1,
+        ):
+            self.assertIsNone(self.cache.get(self.key, [1.0, 0.0]))
+
+    def test_max_keys(self):
+        """Test that the least recently used key is evicted."""
+        cache = LLMSemanticCache(max_keys=2)
+        keys = [LLMSemanticCache.cache_key("host", "graph", i) for i in range(3)]
+        for key in keys:
+            cache.set(key, [1.0, 0.0], "a")
+        self.assertIsNone(cache.get(keys[0], [1.0, 0.0]))
+        self.assertEqual(cache.get(keys[2], [1.0, 0.0]), "a")
+
+    def test_invalidate(self):
+        """Test that invalidate only drops the answers of the given graph."""
+        other = LLMSemanticCache.cache_key("host", "other_graph", "index", 5)
+        self.cache.set(self.key, [1.0, 0.0], "a")
+        self.cache.set(other, [1.0, 0.0], "b")
+        self.cache.invalidate("host", "graph")
+        self.assertIsNone(self.cache.get(self.key, [1.0, 0.0]))
+        self.assertEqual(self.cache.get(other, [1.0, 0.0]), "b")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from common.db.tg_utils import install_gds, parse_tg_version
+
+
+class TestParseTgVersion(unittest.TestCase):
+    def test_release(self):
+        self.assertEqual(parse_tg_version("4.2.0"), (4, 2, 0))
+
+    def test_suffixed_versions(self):
+        """Test that suffixes after the numeric parts are ignored."""
+        self.assertEqual(parse_tg_version("4.2.0-rc1"), (4, 2, 0))
+        self.assertEqual(parse_tg_version("4.1.3_dev"), (4, 1, 3))
+
+    def test_without_patch(self):
+        self.assertEqual(parse_tg_version("4.2"), (4, 2, 0))
+
+    def test_compares_as_tuple(self):
+        """Test that later majors pass a check against (4, 2)."""
+        self.assertGreaterEqual(parse_tg_version("5.0.1"), (4, 2))
+        self.assertLess(parse_tg_version("4.1.3"), (4, 2))
+
+    def test_unrecognized(self):
+        with self.assertRaises(ValueError):
+            parse_tg_version("dev")
+
+
+class TestInstallGds(unittest.TestCase):
+    def make_conn(self, host):
+        conn = MagicMock()
+        conn.host = host
+        return conn
+
+    @patch("common.db.tg_utils._gds_installed_hosts", set())
+    def test_once_per_host(self):
+        """Test that GDS is installed once per host, by any connection."""
+        first = self.make_conn("http://tg1")
+        second = self.make_conn("http://tg1")
+        other = self.make_conn("http://tg2")
+        for conn in [first, second, other]:
+            install_gds(conn)
+        first.gsql.assert_called_once()
+        second.gsql.assert_not_called()
+        other.gsql.assert_called_once()
+
+    @patch("common.db.tg_utils._gds_installed_hosts", set())
+    def test_retries_failed_install(self):
+        """Test that a host whose install raised is not recorded."""
+        conn = self.make_conn("http://tg1")
+        conn.gsql.side_effect = [Exception("install failed"), "ok"]
+        with self.assertRaises(Exception):
+            install_gds(conn)
+        install_gds(conn)
+        self.assertEqual(conn.gsql.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from app.tools.validation_utils import (
+    validate_schema_names,
+    MapQuestionToSchemaException,
+)
+
+
+class TestValidateSchemaNames(unittest.TestCase):
+    def setUp(self):
+        self.vertex_attr_names = {"Person": ["id", "name"], "City": ["name"]}
+        self.edge_attr_names = {"lives_in": ["since"]}
+
+    def validate(self, v_types, e_types, v_attrs=None, e_attrs=None):
+        return validate_schema_names(
+            self.vertex_attr_names,
+            self.edge_attr_names,
+            v_types,
+            e_types,
+            v_attrs,
+            e_attrs,
+        )
+
+    def test_valid(self):
+        """Test that types and attributes found in the schema validate."""
+        self.assertTrue(
+            self.validate(
+                ["Person", "City"],
+                ["lives_in"],
+                {"Person": ["name", ""], "City": ["name"]},
+                {"lives_in": ["since"]},
+            )
+        )
+
+    def test_no_types(self):
+        """Test that missing type lists validate."""
+        self.assertTrue(self.validate(None, None))
+
+    def test_unknown_vertex_type(self):
+        with self.assertRaisesRegex(MapQuestionToSchemaException, "Country"):
+            self.validate(["Country"], [])
+
+    def test_unknown_edge_type(self):
+        with self.assertRaisesRegex(MapQuestionToSchemaException, "born_in"):
+            self.validate(["Person"], ["born_in"])
+
+    def test_unknown_vertex_attribute(self):
+        with self.assertRaisesRegex(MapQuestionToSchemaException, "age is not found for Person"):
+            self.validate(["Person"], [], {"Person": ["age"]})
+
+    def test_unknown_edge_attribute(self):
+        with self.assertRaisesRegex(MapQuestionToSchemaException, "until is not found for lives_in"):
+            self.validate([], ["lives_in"], None, {"lives_in": ["until"]})
+
+    def test_none_attribute(self):
+        with self.assertRaisesRegex(MapQuestionToSchemaException, "None is not found for Person"):
+            self.validate(["Person"], [], {"Person": [None]})
+
+
+if __name__ == "__main__":
+    unittest.main()